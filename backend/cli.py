@@ -13,139 +13,197 @@ Usage:
     python cli.py status             # Show node status
 """
 
+import argparse
 import asyncio
 import logging
+import signal
 import sys
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Optional, List, TYPE_CHECKING
 
-import click
-from rich.console import Console
-from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
-from rich.panel import Panel
-from rich.logging import RichHandler
+if __name__ == '__main__':
+    # Add src to path (only when run as a script, not when imported)
+    sys.path.insert(0, str(Path(__file__).parent))
+
+# The node stack (DHT, transfer, discovery) is imported inside each command
+# so that `--help` and argument errors stay cheap.
+if TYPE_CHECKING:
+    from src.node import NodeConfig
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent))
+# Minimum seconds between download progress bar redraws
+PROGRESS_INTERVAL = 0.05
 
-from src.node import P2PNode, NodeConfig
-from src.file import FileManifest
+# Rich is only imported once a command actually renders output, so that
+# `--help` and argument errors don't pay for loading it.
+_console = None
 
-console = Console()
+
+def get_console():
+    """Return the shared Rich console (created on first use)."""
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
 
 
 def setup_logging(verbose: bool = False):
     """Configure logging with rich output."""
+    from rich.logging import RichHandler
+    
     level = logging.DEBUG if verbose else logging.INFO
     logging.basicConfig(
         level=level,
         format="%(message)s",
-        handlers=[RichHandler(console=console, show_time=False, show_path=False)]
+        handlers=[RichHandler(console=get_console(), show_time=False, show_path=False)]
     )
 
 
-# Global node reference for commands that need it
-_node: Optional[P2PNode] = None
-
-
-@click.group()
-@click.option('-v', '--verbose', is_flag=True, help='Enable verbose output')
-@click.option('--data-dir', default='./p2p_data', help='Data directory')
-@click.option('--dht-port', default=8468, help='DHT UDP port')
-@click.option('--transfer-port', default=8469, help='File transfer TCP port')
-@click.pass_context
-def cli(ctx, verbose, data_dir, dht_port, transfer_port):
-    """P2P File Sharing System - DHT-based decentralized file sharing."""
-    setup_logging(verbose)
-    ctx.ensure_object(dict)
-    ctx.obj['config'] = NodeConfig(
-        data_dir=Path(data_dir),
-        dht_port=dht_port,
-        transfer_port=transfer_port,
-    )
+def _run(coro):
+    """
+    Run a command's coroutine on the fastest available event loop.
+    
+    Prefers uringcore (io_uring-backed, Linux 5.11+), then uvloop, then
+    the stdlib loop. The DHT's UDP traffic and the API server both run on
+    this loop, so they pick it up without further changes.
+    """
+    if sys.platform == 'linux':
+        try:
+            import uringcore
+        except ImportError:
+            pass
+        else:
+            asyncio.set_event_loop_policy(uringcore.EventLoopPolicy())
+            return asyncio.run(coro)
+    
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(coro)
+    
+    if sys.version_info >= (3, 12):
+        return uvloop.run(coro)
+    uvloop.install()
+    return asyncio.run(coro)
 
 
-@cli.command()
-@click.option('--api-port', default=8080, help='REST API port')
-@click.option('--no-api', is_flag=True, help='Disable REST API')
-@click.option('--bootstrap', multiple=True, help='Bootstrap node (host:port)')
-@click.pass_context
-def start(ctx, api_port, no_api, bootstrap):
+async def _wait_for_shutdown():
+    """Sleep until SIGINT/SIGTERM arrives (no periodic wakeups)."""
+    loop = asyncio.get_running_loop()
+    stop_event = asyncio.Event()
+    signals = (signal.SIGINT, signal.SIGTERM)
+    
+    try:
+        for sig in signals:
+            loop.add_signal_handler(sig, stop_event.set)
+    except NotImplementedError:
+        # Windows event loops don't support signal handlers;
+        # Ctrl+C still arrives as KeyboardInterrupt
+        while True:
+            await asyncio.sleep(3600)
+    
+    try:
+        await stop_event.wait()
+    finally:
+        for sig in signals:
+            loop.remove_signal_handler(sig)
+
+
+@asynccontextmanager
+async def _running_node(config: 'NodeConfig'):
+    """Start a P2P node for the duration of a command, always stopping it."""
+    from src.node import P2PNode
+    
+    node = P2PNode(config)
+    try:
+        await node.start()
+        yield node
+    finally:
+        await node.stop()
+
+
+def start(config: 'NodeConfig', args: argparse.Namespace):
     """Start a P2P node."""
-    config = ctx.obj['config']
+    from rich.panel import Panel
+    
+    console = get_console()
+    api_port = args.api_port
+    no_api = args.no_api
+    bootstrap = args.bootstrap
+    auto_tune = args.auto_tune
+    bandwidth_bps = args.bandwidth * 1_000_000
     
     # Parse bootstrap nodes
     if bootstrap:
+        from config import parse_host_port
+        
         config.bootstrap_nodes = []
         for node in bootstrap:
-            try:
-                host, port = node.split(':')
-                config.bootstrap_nodes.append((host, int(port)))
-            except ValueError:
+            parsed = parse_host_port(node)
+            if parsed is None:
                 console.print(f"[red]Invalid bootstrap format: {node} (use host:port)[/red]")
                 return
+            config.bootstrap_nodes.append(parsed)
     
     async def run():
-        node = P2PNode(config)
-        
         try:
-            await node.start()
-            
-            # Display info
-            console.print(Panel.fit(
-                f"[bold green]P2P Node Started[/bold green]\n\n"
-                f"Node ID: [cyan]{node.node_id_hex[:32]}...[/cyan]\n"
-                f"DHT Port: [yellow]{config.dht_port}[/yellow]\n"
-                f"Transfer Port: [yellow]{config.transfer_port}[/yellow]\n"
-                f"Data Dir: [blue]{config.data_dir}[/blue]",
-                title="Node Info"
-            ))
-            
-            if not no_api:
-                console.print(f"\n[dim]REST API available at http://localhost:{api_port}[/dim]")
-                console.print("[dim]API docs at http://localhost:{api_port}/docs[/dim]\n")
+            async with _running_node(config) as node:
+                if auto_tune:
+                    await node.auto_tune_transfer(bandwidth_bps)
                 
-                from src.api import run_api_server
-                await run_api_server(node, port=api_port)
-            else:
-                console.print("\n[dim]Press Ctrl+C to stop[/dim]\n")
-                while True:
-                    await asyncio.sleep(1)
+                # Display info
+                short_id = node.node_id_hex[:32]
+                console.print(Panel.fit(
+                    f"[bold green]P2P Node Started[/bold green]\n\n"
+                    f"Node ID: [cyan]{short_id}...[/cyan]\n"
+                    f"DHT Port: [yellow]{config.dht_port}[/yellow]\n"
+                    f"Transfer Port: [yellow]{config.transfer_port}[/yellow]\n"
+                    f"Data Dir: [blue]{config.data_dir}[/blue]",
+                    title="Node Info"
+                ))
+                
+                if not no_api:
+                    console.print(f"\n[dim]REST API available at http://localhost:{api_port}[/dim]")
+                    console.print(f"[dim]API docs at http://localhost:{api_port}/docs[/dim]\n")
+                    
+                    from src.api import run_api_server
+                    await run_api_server(node, port=api_port)
+                else:
+                    console.print("\n[dim]Press Ctrl+C to stop[/dim]\n")
+                    await _wait_for_shutdown()
+                    console.print("\n[yellow]Shutting down...[/yellow]")
                     
         except KeyboardInterrupt:
             console.print("\n[yellow]Shutting down...[/yellow]")
         finally:
-            await node.stop()
             console.print("[green]Node stopped[/green]")
     
-    asyncio.run(run())
+    _run(run())
 
 
-@cli.command()
-@click.argument('file_path', type=click.Path(exists=True))
-@click.option('--description', '-d', default='', help='File description')
-@click.pass_context
-def share(ctx, file_path, description):
+def share(config: 'NodeConfig', args: argparse.Namespace):
     """Share a file with the network."""
-    config = ctx.obj['config']
-    file_path = Path(file_path)
+    from rich.panel import Panel
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    
+    console = get_console()
+    file_path = Path(args.file_path)
+    description = args.description
     
     async def run():
-        node = P2PNode(config)
-        
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
             console=console,
         ) as progress:
             task = progress.add_task("Starting node...", total=None)
-            await node.start()
-            
-            progress.update(task, description="Sharing file...")
-            manifest = await node.share(file_path, description)
-            
-            progress.update(task, description="Done!")
+            async with _running_node(config) as node:
+                progress.update(task, description="Sharing file...")
+                manifest = await node.share(file_path, description)
+                
+                progress.update(task, description="Done!")
         
         # Display result
         console.print(Panel.fit(
@@ -157,24 +215,19 @@ def share(ctx, file_path, description):
             f"[green]{manifest.info_hash}[/green]",
             title="Shared File"
         ))
-        
-        await node.stop()
     
-    asyncio.run(run())
+    _run(run())
 
 
-@cli.command()
-@click.argument('info_hash')
-@click.option('--output', '-o', type=click.Path(), help='Output path')
-@click.pass_context
-def download(ctx, info_hash, output):
+def download(config: 'NodeConfig', args: argparse.Namespace):
     """Download a file from the network."""
-    config = ctx.obj['config']
-    output_path = Path(output) if output else None
+    from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
+    
+    console = get_console()
+    info_hash = args.info_hash
+    output_path = Path(args.output) if args.output else None
     
     async def run():
-        node = P2PNode(config)
-        
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
@@ -183,173 +236,279 @@ def download(ctx, info_hash, output):
             console=console,
         ) as progress:
             task = progress.add_task("Starting node...", total=100)
-            await node.start()
-            
-            progress.update(task, description="Finding peers...")
-            
-            # Progress callback
-            def update_progress(p):
-                progress.update(
-                    task, 
-                    completed=p.progress_percent,
-                    description=f"Downloading... ({p.downloaded_chunks}/{p.total_chunks} chunks)"
-                )
-            
-            result = await node.download(info_hash, output_path, update_progress)
-            
-            if result:
-                progress.update(task, completed=100, description="Done!")
-                console.print(f"\n[green]✓ Downloaded to: {result}[/green]")
-            else:
-                console.print("\n[red]✗ Download failed[/red]")
-        
-        await node.stop()
+            async with _running_node(config) as node:
+                progress.update(task, description="Finding peers...")
+                
+                # Progress callback, throttled to ~20 redraws/s (the final
+                # update always goes through)
+                last_update = 0.0
+                
+                def update_progress(p):
+                    nonlocal last_update
+                    now = time.monotonic()
+                    if (now - last_update < PROGRESS_INTERVAL
+                            and p.downloaded_chunks != p.total_chunks):
+                        return
+                    last_update = now
+                    progress.update(
+                        task, 
+                        completed=p.progress_percent,
+                        description=f"Downloading... ({p.downloaded_chunks}/{p.total_chunks} chunks)"
+                    )
+                
+                result = await node.download(info_hash, output_path, update_progress)
+                
+                if result:
+                    progress.update(task, completed=100, description="Done!")
+                    console.print(f"\n[green]✓ Downloaded to: {result}[/green]")
+                else:
+                    console.print("\n[red]✗ Download failed[/red]")
     
-    asyncio.run(run())
+    _run(run())
 
 
-@cli.command('list')
-@click.pass_context
-def list_files(ctx):
+def list_files(config: 'NodeConfig', args: argparse.Namespace):
     """List shared files."""
-    config = ctx.obj['config']
+    from rich.table import Table
+    
+    console = get_console()
     
     async def run():
-        node = P2PNode(config)
-        await node.start()
-        
-        manifests = await node.list_shared_files()
-        
-        if not manifests:
-            console.print("[yellow]No shared files[/yellow]")
-        else:
-            table = Table(title="Shared Files")
-            table.add_column("Name", style="cyan")
-            table.add_column("Size", justify="right", style="yellow")
-            table.add_column("Chunks", justify="right")
-            table.add_column("Info Hash", style="green")
-            
-            for m in manifests:
-                size_str = format_size(m.size)
-                table.add_row(
-                    m.name,
-                    size_str,
-                    str(m.chunk_count),
-                    m.info_hash[:16] + "..."
-                )
+        async with _running_node(config) as node:
+            manifests = await node.list_shared_files()
             
-            console.print(table)
-        
-        await node.stop()
+            if not manifests:
+                console.print("[yellow]No shared files[/yellow]")
+            else:
+                table = Table(title="Shared Files")
+                table.add_column("Name", style="cyan")
+                table.add_column("Size", justify="right", style="yellow")
+                table.add_column("Chunks", justify="right")
+                table.add_column("Info Hash", style="green")
+                
+                rows = [
+                    (m.name, format_size(m.size), str(m.chunk_count), _short_id(m.info_hash))
+                    for m in manifests
+                ]
+                for row in rows:
+                    table.add_row(*row)
+                
+                console.print(table)
     
-    asyncio.run(run())
+    _run(run())
 
 
-@cli.command()
-@click.pass_context
-def peers(ctx):
+def peers(config: 'NodeConfig', args: argparse.Namespace):
     """List discovered peers."""
-    config = ctx.obj['config']
+    from rich.table import Table
+    
+    console = get_console()
     
     async def run():
-        node = P2PNode(config)
-        
         console.print("[dim]Discovering peers...[/dim]")
-        await node.start()
-        await asyncio.sleep(3)  # Wait for discovery
-        
-        discovered = node.get_peers()
-        dht_nodes = node.dht.routing_table.get_all_nodes()
-        
-        if not discovered and not dht_nodes:
-            console.print("[yellow]No peers found[/yellow]")
-        else:
-            if discovered:
-                table = Table(title="Discovered Peers (LAN)")
-                table.add_column("Node ID", style="cyan")
-                table.add_column("IP", style="yellow")
-                table.add_column("DHT Port")
-                table.add_column("Transfer Port")
-                
-                for p in discovered:
-                    table.add_row(
-                        p.node_id[:16] + "...",
-                        p.ip,
-                        str(p.dht_port),
-                        str(p.transfer_port)
-                    )
-                
-                console.print(table)
+        async with _running_node(config) as node:
+            await asyncio.sleep(3)  # Wait for discovery
             
-            if dht_nodes:
-                table = Table(title="DHT Routing Table")
-                table.add_column("Node ID", style="cyan")
-                table.add_column("Address", style="yellow")
-                
-                for n in dht_nodes[:20]:
-                    table.add_row(
-                        n.node_id.hex()[:16] + "...",
-                        f"{n.ip}:{n.port}"
-                    )
-                
-                if len(dht_nodes) > 20:
-                    console.print(f"[dim]... and {len(dht_nodes) - 20} more[/dim]")
+            discovered = node.get_peers()
+            
+            # Show the 20 nodes closest to us; only those rows get formatted
+            routing_table = node.dht.routing_table
+            dht_total = len(routing_table)
+            dht_rows = [
+                (_short_id(n.node_id.hex()), f"{n.ip}:{n.port}")
+                for n in routing_table.find_closest_nodes(node.node_id, 20)
+            ]
+            
+            if not discovered and not dht_rows:
+                console.print("[yellow]No peers found[/yellow]")
+            else:
+                if discovered:
+                    table = Table(title="Discovered Peers (LAN)")
+                    table.add_column("Node ID", style="cyan")
+                    table.add_column("IP", style="yellow")
+                    table.add_column("DHT Port")
+                    table.add_column("Transfer Port")
+                    
+                    rows = [
+                        (_short_id(p.node_id), p.ip, str(p.dht_port), str(p.transfer_port))
+                        for p in discovered
+                    ]
+                    for row in rows:
+                        table.add_row(*row)
+                    
+                    console.print(table)
                 
-                console.print(table)
-        
-        await node.stop()
+                if dht_rows:
+                    table = Table(title="DHT Routing Table")
+                    table.add_column("Node ID", style="cyan")
+                    table.add_column("Address", style="yellow")
+                    
+                    for row in dht_rows:
+                        table.add_row(*row)
+                    
+                    if dht_total > len(dht_rows):
+                        console.print(f"[dim]... and {dht_total - len(dht_rows)} more[/dim]")
+                    
+                    console.print(table)
     
-    asyncio.run(run())
+    _run(run())
 
 
-@cli.command()
-@click.pass_context
-def status(ctx):
+def status(config: 'NodeConfig', args: argparse.Namespace):
     """Show node status."""
-    config = ctx.obj['config']
+    from rich.panel import Panel
+    
+    console = get_console()
     
     async def run():
-        node = P2PNode(config)
-        await node.start()
-        
-        stats = node.get_full_stats()
-        storage = await node.get_storage_stats()
-        
-        console.print(Panel.fit(
-            f"[bold]Node Status[/bold]\n\n"
-            f"Node ID: [cyan]{stats['node_id'][:32]}...[/cyan]\n"
-            f"Running: [green]{'Yes' if stats['running'] else 'No'}[/green]\n\n"
-            f"[bold]DHT[/bold]\n"
-            f"  Nodes in routing table: [yellow]{stats['dht']['routing_table']['total_nodes']}[/yellow]\n"
-            f"  Stored values: [yellow]{stats['dht']['stored_values']}[/yellow]\n"
-            f"  Tracked files: [yellow]{stats['dht']['tracked_files']}[/yellow]\n\n"
-            f"[bold]Discovery[/bold]\n"
-            f"  Discovered peers: [yellow]{stats['discovery']['total_peers']}[/yellow]\n"
-            f"  mDNS available: [{'green' if stats['discovery']['mdns_available'] else 'red'}]"
-            f"{'Yes' if stats['discovery']['mdns_available'] else 'No'}[/]\n\n"
-            f"[bold]Storage[/bold]\n"
-            f"  Chunks: [yellow]{storage['chunks']}[/yellow]\n"
-            f"  Size: [yellow]{format_size(storage['bytes'])}[/yellow]\n"
-            f"  Manifests: [yellow]{storage['manifests']}[/yellow]",
-            title="P2P Node Status"
-        ))
-        
-        await node.stop()
+        async with _running_node(config) as node:
+            stats = node.get_full_stats()
+            storage = await node.get_storage_stats()
+            
+            short_id = stats['node_id'][:32]
+            dht = stats['dht']
+            discovery = stats['discovery']
+            mdns_color, mdns_text = (
+                ('green', 'Yes') if discovery['mdns_available'] else ('red', 'No')
+            )
+            
+            lines = [
+                "[bold]Node Status[/bold]",
+                "",
+                f"Node ID: [cyan]{short_id}...[/cyan]",
+                f"Running: [green]{'Yes' if stats['running'] else 'No'}[/green]",
+                "",
+                "[bold]DHT[/bold]",
+                f"  Nodes in routing table: [yellow]{dht['routing_table']['total_nodes']}[/yellow]",
+                f"  Stored values: [yellow]{dht['stored_values']}[/yellow]",
+                f"  Tracked files: [yellow]{dht['tracked_files']}[/yellow]",
+                "",
+                "[bold]Discovery[/bold]",
+                f"  Discovered peers: [yellow]{discovery['total_peers']}[/yellow]",
+                f"  mDNS available: [{mdns_color}]{mdns_text}[/]",
+                "",
+                "[bold]Storage[/bold]",
+                f"  Chunks: [yellow]{storage['chunks']}[/yellow]",
+                f"  Size: [yellow]{format_size(storage['bytes'])}[/yellow]",
+                f"  Manifests: [yellow]{storage['manifests']}[/yellow]",
+            ]
+            console.print(Panel.fit("\n".join(lines), title="P2P Node Status"))
     
-    asyncio.run(run())
+    _run(run())
+
+
+def _short_id(hex_id: str) -> str:
+    """Abbreviate a hex ID/hash for table display."""
+    return hex_id[:16] + "..."
+
+
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
 
 
 def format_size(bytes_count: int) -> str:
     """Format bytes as human-readable size."""
-    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-        if bytes_count < 1024:
-            return f"{bytes_count:.1f} {unit}"
-        bytes_count /= 1024
-    return f"{bytes_count:.1f} PB"
+    if bytes_count <= 0:
+        return "0.0 B"
+    # Each unit is 2^10 larger, so the unit index falls out of the bit length
+    idx = min((bytes_count.bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{bytes_count / (1 << (idx * 10)):.1f} {_SIZE_UNITS[idx]}"
+
+
+# Command name -> handler(config, args). main() builds the NodeConfig once
+# from the global options and passes it straight to the handler.
+COMMANDS = {
+    'start': start,
+    'share': share,
+    'download': download,
+    'list': list_files,
+    'peers': peers,
+    'status': status,
+}
+
+
+def _existing_path(value: str) -> str:
+    """argparse type: require that the path exists."""
+    if not Path(value).exists():
+        raise argparse.ArgumentTypeError(f"Path '{value}' does not exist.")
+    return value
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser (global options + one subparser per command)."""
+    parser = argparse.ArgumentParser(
+        prog='cli.py',
+        description="P2P File Sharing System - DHT-based decentralized file sharing.",
+    )
+    parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose output')
+    parser.add_argument('--data-dir', default='./p2p_data', help='Data directory')
+    parser.add_argument('--dht-port', type=int, default=8468, help='DHT UDP port')
+    parser.add_argument('--transfer-port', type=int, default=8469, help='File transfer TCP port')
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help='Chunk size in bytes for shared files (default: 262144)')
+    parser.add_argument('--max-concurrent', type=int, default=None,
+                        help='Initial concurrent chunk downloads, auto-tuned per file (default: 8)')
+    
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND')
+    
+    def add_command(name: str) -> argparse.ArgumentParser:
+        doc = COMMANDS[name].__doc__
+        return subparsers.add_parser(name, help=doc, description=doc)
+    
+    p = add_command('start')
+    p.add_argument('--api-port', type=int, default=8080, help='REST API port')
+    p.add_argument('--no-api', action='store_true', help='Disable REST API')
+    p.add_argument('--bootstrap', action='append', default=[], help='Bootstrap node (host:port)')
+    p.add_argument('--auto-tune', action='store_true',
+                   help='Size chunks to the bandwidth-delay product measured at startup')
+    p.add_argument('--bandwidth', type=float, default=100.0,
+                   help='Link bandwidth in Mbit/s used by --auto-tune')
+    
+    p = add_command('share')
+    p.add_argument('file_path', type=_existing_path)
+    p.add_argument('--description', '-d', default='', help='File description')
+    
+    p = add_command('download')
+    p.add_argument('info_hash')
+    p.add_argument('--output', '-o', help='Output path')
+    
+    add_command('list')
+    add_command('peers')
+    add_command('status')
+    
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    """Parse arguments and dispatch to the selected command."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    
+    if args.command is None:
+        parser.print_help()
+        return
+    
+    from src.node import NodeConfig, MAX_CHUNK_SIZE
+    
+    if args.chunk_size is not None and not 4096 <= args.chunk_size <= MAX_CHUNK_SIZE:
+        parser.error(f"--chunk-size must be between 4096 and {MAX_CHUNK_SIZE} bytes")
+    if args.max_concurrent is not None and args.max_concurrent < 1:
+        parser.error("--max-concurrent must be at least 1")
+    
+    setup_logging(args.verbose)
+    config = NodeConfig(
+        data_dir=Path(args.data_dir),
+        dht_port=args.dht_port,
+        transfer_port=args.transfer_port,
+    )
+    if args.chunk_size is not None:
+        config.chunk_size = args.chunk_size
+    if args.max_concurrent is not None:
+        config.max_concurrent_downloads = args.max_concurrent
+    COMMANDS[args.command](config, args)
 
 
 if __name__ == '__main__':
-    cli()
+    main()
 
 
 
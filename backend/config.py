@@ -6,14 +6,86 @@ Handles loading configuration from environment variables and config files.
 
 import os
 from pathlib import Path
-from dataclasses import dataclass, field
-from typing import List, Tuple, Optional
-import json
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Tuple, Optional
 
 from dotenv import load_dotenv
 
+# Prefer orjson for config (de)serialization, fall back to the stdlib
+try:
+    import orjson
+    
+    _json_loads = orjson.loads
+    
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    import json
+    
+    _json_loads = json.loads
+    
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode('utf-8')
+
+
+def parse_host_port(value: str) -> Optional[Tuple[str, int]]:
+    """
+    Parse a 'host:port' string (IPv6 as '[addr]:port').
+    
+    Returns:
+        (host, port) tuple, or None if the string is not valid
+    """
+    value = value.strip()
+    sep = value.rfind(':')
+    if sep <= 0:
+        return None
+    
+    host, port_str = value[:sep], value[sep + 1:]
+    if host.startswith('[') and host.endswith(']'):
+        host = host[1:-1]
+    if not (host and port_str.isascii() and port_str.isdigit()):
+        return None
+    
+    port = int(port_str)
+    if not 0 < port < 65536:
+        return None
+    return host, port
+
+
+_dotenv_loaded = False
+
+
+def _load_dotenv_once():
+    """Read .env into the environment (only on first use)."""
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        load_dotenv()
+        _dotenv_loaded = True
+
+
+def _parse_bool(value: str) -> bool:
+    return value.lower() == 'true'
+
+
+# Environment variables read by Config.from_env: (field, variable, parser)
+_ENV_SCHEMA = (
+    # Network
+    ('host', 'P2P_HOST', str),
+    ('dht_port', 'P2P_DHT_PORT', int),
+    ('transfer_port', 'P2P_TRANSFER_PORT', int),
+    ('api_port', 'P2P_API_PORT', int),
+    # Storage
+    ('data_dir', 'P2P_DATA_DIR', Path),
+    # Discovery
+    ('auto_discover', 'P2P_AUTO_DISCOVER', _parse_bool),
+    # Performance
+    ('max_concurrent_downloads', 'P2P_MAX_CONCURRENT', int),
+    # Logging
+    ('log_level', 'P2P_LOG_LEVEL', str),
+)
+
 
-@dataclass
+@dataclass(slots=True)
 class Config:
     """
     P2P Node Configuration.
@@ -37,7 +109,7 @@ class Config:
     bootstrap_nodes: List[Tuple[str, int]] = field(default_factory=list)
     
     # Performance
-    max_concurrent_downloads: int = 5
+    max_concurrent_downloads: int = 8
     chunk_size: int = 256 * 1024  # 256KB
     
     # Timeouts (seconds)
@@ -51,41 +123,24 @@ class Config:
     @classmethod
     def from_env(cls) -> 'Config':
         """Load configuration from environment variables."""
-        load_dotenv()
+        _load_dotenv_once()
         
         config = cls()
+        env = os.environ
         
-        # Network
-        config.host = os.getenv('P2P_HOST', config.host)
-        config.dht_port = int(os.getenv('P2P_DHT_PORT', config.dht_port))
-        config.transfer_port = int(os.getenv('P2P_TRANSFER_PORT', config.transfer_port))
-        config.api_port = int(os.getenv('P2P_API_PORT', config.api_port))
-        
-        # Storage
-        data_dir = os.getenv('P2P_DATA_DIR')
-        if data_dir:
-            config.data_dir = Path(data_dir)
+        for name, key, cast in _ENV_SCHEMA:
+            value = env.get(key)
+            if value:
+                setattr(config, name, cast(value))
         
         # Discovery
-        config.auto_discover = os.getenv('P2P_AUTO_DISCOVER', 'true').lower() == 'true'
-        
-        bootstrap = os.getenv('P2P_BOOTSTRAP_NODES', '')
+        bootstrap = env.get('P2P_BOOTSTRAP_NODES', '')
         if bootstrap:
             config.bootstrap_nodes = []
             for node in bootstrap.split(','):
-                try:
-                    host, port = node.strip().split(':')
-                    config.bootstrap_nodes.append((host, int(port)))
-                except ValueError:
-                    pass
-        
-        # Performance
-        config.max_concurrent_downloads = int(
-            os.getenv('P2P_MAX_CONCURRENT', config.max_concurrent_downloads)
-        )
-        
-        # Logging
-        config.log_level = os.getenv('P2P_LOG_LEVEL', config.log_level)
+                parsed = parse_host_port(node)
+                if parsed:
+                    config.bootstrap_nodes.append(parsed)
         
         return config
     
@@ -95,8 +150,7 @@ class Config:
         if not path.exists():
             return cls()
         
-        with open(path) as f:
-            data = json.load(f)
+        data = _json_loads(path.read_bytes())
         
         config = cls()
         
@@ -134,6 +188,10 @@ class Config:
     
     def to_dict(self) -> dict:
         """Convert to dictionary."""
+        # Built fresh on each call: Config is mutable, and checking whether a
+        # cached snapshot is still current would cost as much as this literal.
+        # bootstrap_nodes stay {host, port} objects because from_file reads
+        # that shape.
         return {
             'host': self.host,
             'dht_port': self.dht_port,
@@ -152,9 +210,34 @@ class Config:
         }
     
     def save(self, path: Path):
-        """Save configuration to a JSON file."""
-        with open(path, 'w') as f:
-            json.dump(self.to_dict(), f, indent=2)
+        """Save configuration to a JSON file (atomically)."""
+        path = Path(path)
+        temp_path = path.with_name(path.name + '.tmp')
+        temp_path.write_bytes(_json_dumps(self.to_dict()))
+        os.replace(temp_path, path)
+
+
+# Default values, used to detect which env settings were actually set.
+# Never mutate this instance.
+_DEFAULTS = Config()
+
+# Fields where environment values override the config file
+_ENV_OVERRIDE_KEYS = ('host', 'dht_port', 'transfer_port', 'api_port',
+                      'data_dir', 'auto_discover', 'log_level')
+
+# Cache of merged configs: (path, file mtime, P2P_* env snapshot) -> Config
+_config_cache: Dict[tuple, Config] = {}
+
+
+def _config_cache_key(config_path: Optional[Path]) -> tuple:
+    """Build a key that changes whenever the inputs to load_config change."""
+    mtime = None
+    if config_path and config_path.exists():
+        mtime = config_path.stat().st_mtime_ns
+    env = tuple(sorted(
+        (k, v) for k, v in os.environ.items() if k.startswith('P2P_')
+    ))
+    return (str(config_path) if config_path else None, mtime, env)
 
 
 def load_config(config_path: Optional[Path] = None) -> Config:
@@ -162,7 +245,20 @@ def load_config(config_path: Optional[Path] = None) -> Config:
     Load configuration from file and environment.
     
     Environment variables override file settings.
+    
+    Results are cached per (file, environment) and a copy is returned,
+    so callers may freely modify the config they get back.
     """
+    key = _config_cache_key(config_path)
+    cached = _config_cache.get(key)
+    if cached is None:
+        cached = _load_config(config_path)
+        _config_cache[key] = cached
+    return replace(cached, bootstrap_nodes=list(cached.bootstrap_nodes))
+
+
+def _load_config(config_path: Optional[Path]) -> Config:
+    """Load and merge file and environment configuration (uncached)."""
     # Start with defaults
     config = Config()
     
@@ -174,11 +270,9 @@ def load_config(config_path: Optional[Path] = None) -> Config:
     env_config = Config.from_env()
     
     # Merge (env takes precedence for non-default values)
-    for key in ['host', 'dht_port', 'transfer_port', 'api_port', 
-                'data_dir', 'auto_discover', 'log_level']:
+    for key in _ENV_OVERRIDE_KEYS:
         env_val = getattr(env_config, key)
-        default_val = getattr(Config(), key)
-        if env_val != default_val:
+        if env_val != getattr(_DEFAULTS, key):
             setattr(config, key, env_val)
     
     # Bootstrap nodes are additive
@@ -199,7 +293,7 @@ EXAMPLE_CONFIG = """
   "bootstrap_nodes": [
     {"host": "192.168.1.100", "port": 8468}
   ],
-  "max_concurrent_downloads": 5,
+  "max_concurrent_downloads": 8,
   "chunk_size": 262144,
   "log_level": "INFO"
 }
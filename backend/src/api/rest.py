@@ -23,21 +23,72 @@ API Design:
 """
 
 import asyncio
+import json
 import logging
+import re
+import time
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Any, Dict, Tuple, Callable
+from urllib.parse import urlsplit
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import (
+    JSONResponse, ORJSONResponse, FileResponse, Response, StreamingResponse,
+)
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
+# orjson makes every JSON response cheaper; fall back to the stdlib
+try:
+    from orjson import dumps as _json_dumps, loads as _json_loads
+    
+    _DefaultResponse = ORJSONResponse
+except ImportError:
+    _json_loads = json.loads
+    _DefaultResponse = JSONResponse
+    
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
 # Global reference to the P2P node (set when app is created)
 _node = None
 
+# SHA-256 info hash as hex
+_INFO_HASH_RE = re.compile(r'[0-9a-fA-F]{64}')
+
+# Download event streams send a heartbeat comment after this much silence
+# (keeps proxies from closing the connection)
+SSE_HEARTBEAT_INTERVAL = 15.0  # seconds
+
+# Progress events buffered per stream before the oldest are dropped
+SSE_QUEUE_SIZE = 256
+
+# Polled endpoints serve pre-serialized JSON for this long
+RESPONSE_CACHE_TTL = 0.5  # seconds
+_response_cache: Dict[str, Tuple[float, bytes]] = {}
+
+
+async def _cached_json(key: str, build: Callable) -> Response:
+    """
+    Serve `build()`'s result as JSON, reusing the encoded bytes for a
+    short while so polling clients don't re-enter the node every time.
+    
+    Args:
+        key: Cache slot (one per endpoint)
+        build: Async callable returning a JSON-serializable object
+    """
+    now = time.monotonic()
+    cached = _response_cache.get(key)
+    if cached and now - cached[0] < RESPONSE_CACHE_TTL:
+        body = cached[1]
+    else:
+        body = _json_dumps(await build())
+        _response_cache[key] = (now, body)
+    return Response(content=body, media_type="application/json")
+
 
 # === Pydantic Models ===
 
@@ -80,6 +131,79 @@ class PeerInfo(BaseModel):
     transfer_port: int
 
 
+class BatchItem(BaseModel):
+    """One API call inside a batch."""
+    id: str
+    url: str
+    method: str = "GET"
+    body: Optional[Any] = None
+
+
+class BatchRequest(BaseModel):
+    """Several API calls to run in one round-trip."""
+    requests: List[BatchItem]
+
+
+# === Batch Dispatch ===
+
+async def _dispatch(app: FastAPI, item: BatchItem) -> Dict[str, Any]:
+    """
+    Run one batched call through the app's own ASGI stack.
+    
+    Going through the app (rather than calling endpoint functions) keeps
+    routing, validation and error handling identical to a real request.
+    """
+    url = urlsplit(item.url)
+    body = b"" if item.body is None else _json_dumps(item.body)
+    headers = [(b"content-type", b"application/json")] if body else []
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": item.method.upper(),
+        "scheme": "http",
+        "path": url.path,
+        "raw_path": url.path.encode("utf-8"),
+        "query_string": url.query.encode("utf-8"),
+        "root_path": "",
+        "headers": headers,
+        "client": None,
+        "server": None,
+    }
+    
+    request_sent = False
+    response_done = asyncio.Event()
+    status = 500
+    chunks: List[bytes] = []
+    
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+    
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                response_done.set()
+    
+    await app(scope, receive, send)
+    
+    raw = b"".join(chunks)
+    try:
+        content = _json_loads(raw) if raw else None
+    except ValueError:
+        content = raw.decode("utf-8", errors="replace")
+    
+    return {"id": item.id, "status": status, "body": content}
+
+
 # === API Creation ===
 
 def create_app(node=None) -> FastAPI:
@@ -94,6 +218,7 @@ def create_app(node=None) -> FastAPI:
     """
     global _node
     _node = node
+    _response_cache.clear()
     
     @asynccontextmanager
     async def lifespan(app: FastAPI):
@@ -106,6 +231,7 @@ def create_app(node=None) -> FastAPI:
         title="P2P File Sharing API",
         description="REST API for the DHT-based P2P file sharing system",
         version="1.0.0",
+        default_response_class=_DefaultResponse,
         lifespan=lifespan,
     )
     
@@ -135,16 +261,19 @@ def create_app(node=None) -> FastAPI:
         if not _node:
             raise HTTPException(status_code=503, detail="Node not initialized")
         
-        stats = _node.get_full_stats()
-        manifests = await _node.list_shared_files()
+        async def build():
+            stats = _node.get_full_stats()
+            manifests = await _node.list_shared_files()
+            
+            return NodeStatus(
+                node_id=stats['node_id'][:16] + "...",
+                running=stats['running'],
+                dht_nodes=stats['dht']['routing_table']['total_nodes'],
+                shared_files=len(manifests),
+                discovered_peers=stats['discovery']['total_peers'],
+            ).model_dump()
         
-        return NodeStatus(
-            node_id=stats['node_id'][:16] + "...",
-            running=stats['running'],
-            dht_nodes=stats['dht']['routing_table']['total_nodes'],
-            shared_files=len(manifests),
-            discovered_peers=stats['discovery']['total_peers'],
-        )
+        return await _cached_json("status", build)
     
     @app.get("/stats", tags=["Node"])
     async def get_stats():
@@ -152,7 +281,10 @@ def create_app(node=None) -> FastAPI:
         if not _node:
             raise HTTPException(status_code=503, detail="Node not initialized")
         
-        return _node.get_full_stats()
+        async def build():
+            return _node.get_full_stats()
+        
+        return await _cached_json("stats", build)
     
     # === File Operations ===
     
@@ -197,7 +329,7 @@ def create_app(node=None) -> FastAPI:
         
         # Validate info_hash format (should be 64 hex characters for SHA-256)
         info_hash = request.info_hash.strip()
-        if len(info_hash) != 64 or not all(c in '0123456789abcdefABCDEF' for c in info_hash):
+        if not _INFO_HASH_RE.fullmatch(info_hash):
             raise HTTPException(
                 status_code=400, 
                 detail=f"Invalid info_hash format. Expected 64 hex characters, got: {info_hash[:20]}..."
@@ -229,6 +361,101 @@ def create_app(node=None) -> FastAPI:
             logger.error(f"Download error: {e}", exc_info=True)
             raise HTTPException(status_code=500, detail=str(e))
     
+    @app.get("/files/download/{info_hash}/stream", tags=["Files"])
+    async def download_file_stream(info_hash: str):
+        """
+        Download a file, streaming progress as Server-Sent Events.
+        
+        Sends `progress` events as chunks arrive, then one `complete` or
+        `error` event. The stream is event-driven: it only wakes for
+        progress, completion, or a heartbeat after a quiet period.
+        Closing the stream cancels the download.
+        """
+        if not _node:
+            raise HTTPException(status_code=503, detail="Node not initialized")
+        
+        info_hash = info_hash.strip()
+        if not _INFO_HASH_RE.fullmatch(info_hash):
+            raise HTTPException(
+                status_code=400, 
+                detail=f"Invalid info_hash format. Expected 64 hex characters, got: {info_hash[:20]}..."
+            )
+        
+        # Bounded so a slow reader can't grow memory. Progress events are
+        # cumulative snapshots, so dropping the oldest loses nothing; the
+        # final complete/error event doesn't go through the queue.
+        progress_queue: asyncio.Queue = asyncio.Queue(maxsize=SSE_QUEUE_SIZE)
+        
+        def frame(event: dict) -> bytes:
+            return b"data: " + _json_dumps(event) + b"\n\n"
+        
+        # Events are framed here, once, so the generator just passes bytes on
+        def progress_callback(progress):
+            event = frame({"type": "progress", **progress.to_dict()})
+            try:
+                progress_queue.put_nowait(event)
+            except asyncio.QueueFull:
+                progress_queue.get_nowait()
+                progress_queue.put_nowait(event)
+        
+        async def event_generator():
+            download_task = asyncio.create_task(
+                _node.download(info_hash, None, progress_callback)
+            )
+            get_task = None
+            try:
+                while not download_task.done():
+                    if get_task is None:
+                        get_task = asyncio.ensure_future(progress_queue.get())
+                    
+                    done, _ = await asyncio.wait(
+                        {get_task, download_task},
+                        timeout=SSE_HEARTBEAT_INTERVAL,
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                    if not done:
+                        yield b": heartbeat\n\n"
+                    elif get_task in done:
+                        yield get_task.result()
+                        get_task = None
+                
+                # Cancelling a waiting get() leaves queued items in place
+                if get_task is not None:
+                    get_task.cancel()
+                    get_task = None
+                while not progress_queue.empty():
+                    yield progress_queue.get_nowait()
+                
+                try:
+                    result = download_task.result()
+                except Exception as e:
+                    logger.error(f"Download error: {e}", exc_info=True)
+                    yield frame({"type": "error", "message": str(e)})
+                    return
+                
+                if result:
+                    yield frame({
+                        "type": "complete",
+                        "info_hash": info_hash,
+                        "file_path": str(result),
+                    })
+                else:
+                    yield frame({
+                        "type": "error",
+                        "message": "Download failed - file not found or no peers available",
+                    })
+            finally:
+                if get_task is not None:
+                    get_task.cancel()
+                if not download_task.done():
+                    download_task.cancel()
+        
+        return StreamingResponse(
+            event_generator(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    
     @app.get("/files", response_model=List[FileInfo], tags=["Files"])
     async def list_files():
         """List all shared files."""
@@ -278,6 +505,34 @@ def create_app(node=None) -> FastAPI:
         success = await _node.remove_shared_file(info_hash)
         return {"success": success}
     
+    # === Batch ===
+    
+    @app.post("/batch", tags=["General"])
+    async def batch(request: BatchRequest):
+        """
+        Run several API calls in one round-trip.
+        
+        Calls run concurrently; each gets its own status and body, and a
+        failing call does not affect the others.
+        """
+        for item in request.requests:
+            if not item.url.startswith("/") or urlsplit(item.url).path == "/batch":
+                raise HTTPException(status_code=400, detail=f"Invalid batch url: {item.url}")
+        
+        results = await asyncio.gather(
+            *(_dispatch(app, item) for item in request.requests),
+            return_exceptions=True,
+        )
+        
+        responses = []
+        for item, result in zip(request.requests, results):
+            if isinstance(result, Exception):
+                logger.error(f"Batch call {item.id} failed: {result}")
+                result = {"id": item.id, "status": 500, "body": {"detail": str(result)}}
+            responses.append(result)
+        
+        return {"responses": responses}
+    
     # === Peer Operations ===
     
     @app.get("/peers", response_model=List[PeerInfo], tags=["Peers"])
@@ -328,13 +583,24 @@ async def run_api_server(node, host: str = "0.0.0.0", port: int = 8080):
     """
     import uvicorn
     
+    try:
+        import httptools  # noqa: F401
+        http_impl = "httptools"
+    except ImportError:
+        http_impl = "h11"
+    
     app = create_app(node)
     
+    # Serving inside the caller's loop, so uvicorn's `loop` option does not
+    # apply here - the CLI already runs everything on uvloop when installed.
     config = uvicorn.Config(
         app,
         host=host,
         port=port,
         log_level="info",
+        http=http_impl,
+        ws="none",
+        access_log=False,
     )
     server = uvicorn.Server(config)
     await server.serve()
@@ -5,7 +5,7 @@ This module provides the distributed hash table functionality
 using the Kademlia protocol.
 """
 
-from .utils import generate_node_id, xor_distance, bytes_to_int, int_to_bytes, id_to_hex, hex_to_id
+from .utils import generate_node_id, xor_distance, bytes_to_int, int_to_bytes, id_to_hex, hex_to_id, as_id
 from .routing import KBucket, RoutingTable, NodeInfo
 from .protocol import DHTProtocol, Message, MessageType
 from .kademlia import KademliaNode
@@ -17,6 +17,7 @@ __all__ = [
     'int_to_bytes',
     'id_to_hex',
     'hex_to_id',
+    'as_id',
     'KBucket',
     'RoutingTable',
     'NodeInfo',
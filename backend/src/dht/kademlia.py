@@ -30,13 +30,13 @@ from typing import Optional, List, Dict, Any, Tuple, Set
 from dataclasses import dataclass
 
 from .utils import (
-    ID_BITS, generate_node_id, xor_distance, id_to_hex,
-    sort_by_distance, hex_to_id
+    ID_BITS, ID_BYTES, generate_node_id, xor_distance, id_to_hex,
+    sort_by_distance, as_id, as_node_id
 )
 from .routing import RoutingTable, NodeInfo, K, ALPHA
 from .protocol import (
     DHTProtocol, Message, MessageType,
-    create_ping, create_pong,
+    create_ping,
     create_find_node, create_find_node_response,
     create_store, create_store_response,
     create_find_value, create_find_value_response,
@@ -45,6 +45,18 @@ from .protocol import (
 
 logger = logging.getLogger(__name__)
 
+# How long (seconds) and for how many keys a lookup's final closest nodes
+# are kept to seed the next lookup of the same key
+RECENT_CLOSEST_TTL = 300.0
+RECENT_CLOSEST_SIZE = 256
+
+# How long (seconds) a find_node lookup is shared by later calls for the
+# same target, e.g. store() and announce_peer() of the same key
+FIND_NODE_REUSE_TTL = 5.0
+
+# At most this many add_contact verification pings run at once
+MAX_CONTACT_VERIFICATIONS = 16
+
 
 @dataclass
 class LookupResult:
@@ -55,6 +67,15 @@ class LookupResult:
     found: bool = False
 
 
+def _not_reusable(task: asyncio.Task) -> bool:
+    """Whether a finished find_node lookup failed or found nothing."""
+    if not task.done():
+        return False
+    if task.cancelled() or task.exception() is not None:
+        return True
+    return not task.result().closest_nodes
+
+
 class KademliaNode:
     """
     A Kademlia DHT node.
@@ -95,6 +116,16 @@ class KademliaNode:
         # info_hash -> set of (ip, port, timestamp)
         self._peers: Dict[bytes, Set[Tuple[str, int, float]]] = {}
         
+        # key -> (expires_at (monotonic), closest nodes from the last lookup)
+        self._recent_closest: Dict[bytes, Tuple[float, List[NodeInfo]]] = {}
+        
+        # target -> (reusable until (monotonic), find_node lookup task)
+        self._find_node_lookups: Dict[bytes, Tuple[float, asyncio.Task]] = {}
+        
+        # node_id -> pending add_contact verification (see add_contact)
+        self._verify_tasks: Dict[bytes, asyncio.Task] = {}
+        self._verify_semaphore = asyncio.Semaphore(MAX_CONTACT_VERIFICATIONS)
+        
         # State
         self._running = False
         self._bootstrap_complete = False
@@ -136,12 +167,19 @@ class KademliaNode:
     async def stop(self):
         """Stop the DHT node."""
         self._running = False
+        
+        # Cancel contact verifications still waiting or pinging
+        tasks = list(self._verify_tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        
         if self.transport:
             self.transport.close()
             self.transport = None
         logger.info("Kademlia node stopped")
     
-    async def bootstrap(self, bootstrap_nodes: List[Tuple[str, int]]):
+    async def bootstrap(self, bootstrap_nodes: List[Tuple[str, int]]) -> int:
         """
         Join the DHT network via bootstrap nodes.
         
@@ -152,10 +190,13 @@ class KademliaNode:
         
         Args:
             bootstrap_nodes: List of (ip, port) tuples
+        
+        Returns:
+            Number of bootstrap nodes that responded (0 means we didn't join)
         """
         if not bootstrap_nodes:
             logger.warning("No bootstrap nodes provided")
-            return
+            return 0
         
         logger.info(f"Bootstrapping with {len(bootstrap_nodes)} nodes")
         
@@ -170,10 +211,11 @@ class KademliaNode:
         
         if successful == 0:
             logger.warning("No bootstrap nodes responded")
-            return
+            return 0
         
-        # Lookup our own ID to find nearby nodes
-        await self.find_node(self.node_id)
+        # Lookup our own ID to find nearby nodes (always a fresh lookup,
+        # the routing table just changed)
+        await self._iterative_lookup(self.node_id, find_value=False)
         
         # Refresh buckets to populate routing table
         await self._refresh_buckets()
@@ -181,6 +223,7 @@ class KademliaNode:
         self._bootstrap_complete = True
         stats = self.routing_table.get_stats()
         logger.info(f"Bootstrap complete: {stats['total_nodes']} nodes in routing table")
+        return successful
     
     # === Public DHT Operations ===
     
@@ -200,31 +243,95 @@ class KademliaNode:
                 ip=ip,
                 port=port,
             )
-            await self.routing_table.add_node(node)
+            self.routing_table.add_node(node)
             return True
         
         return False
     
+    def add_contact(self, node_id: bytes, ip: str, port: int) -> bool:
+        """
+        Add a node learned about outside the DHT (e.g. LAN discovery).
+        
+        The node goes straight into the routing table, so lookups can use
+        it at once instead of after a ping round trip. A ping still runs in
+        the background and drops the node if it doesn't answer.
+        
+        Verification tasks are tracked (one per node, at most
+        MAX_CONTACT_VERIFICATIONS pinging at once), so a burst of
+        discovery events can't spawn an unbounded number of tasks.
+        
+        Returns:
+            True if the node is now in the routing table
+        """
+        if len(node_id) != ID_BYTES:
+            return False
+        
+        self.routing_table.add_node(NodeInfo(node_id=node_id, ip=ip, port=port))
+        if node_id not in self.routing_table:
+            return False  # Ourselves, or its bucket is full
+        
+        if node_id not in self._verify_tasks:
+            task = asyncio.create_task(self._verify_contact(node_id, ip, port))
+            self._verify_tasks[node_id] = task
+            task.add_done_callback(
+                lambda _: self._verify_tasks.pop(node_id, None)
+            )
+        return True
+    
+    async def _verify_contact(self, node_id: bytes, ip: str, port: int):
+        """Drop an unverified contact that fails to answer a ping."""
+        async with self._verify_semaphore:
+            try:
+                alive = await self.ping(ip, port)
+            except Exception as e:
+                logger.debug(f"Verifying {ip}:{port} failed: {e}")
+                alive = False
+        if not alive:
+            self.routing_table.remove_node(node_id)
+    
     async def find_node(self, target_id: bytes) -> List[NodeInfo]:
         """
         Find the K closest nodes to a target ID.
         
-        Uses iterative α-parallel lookup.
+        Uses iterative α-parallel lookup. Calls for the same target within
+        FIND_NODE_REUSE_TTL of a lookup's start share it, so storing and
+        announcing one key (usually done together) costs a single lookup.
         """
-        result = await self._iterative_lookup(target_id, find_value=False)
-        return result.closest_nodes
+        now = time.monotonic()
+        entry = self._find_node_lookups.get(target_id)
+        if entry is None or entry[0] <= now or _not_reusable(entry[1]):
+            lookups = self._find_node_lookups
+            if len(lookups) >= RECENT_CLOSEST_SIZE:
+                for key in [k for k, (until, _) in lookups.items() if until <= now]:
+                    del lookups[key]
+            task = asyncio.ensure_future(
+                self._iterative_lookup(target_id, find_value=False)
+            )
+            entry = (now + FIND_NODE_REUSE_TTL, task)
+            lookups[target_id] = entry
+        
+        # Shielded: one caller being cancelled mustn't cancel the others
+        result = await asyncio.shield(entry[1])
+        return list(result.closest_nodes)
     
-    async def find_value(self, key: bytes) -> Optional[Any]:
+    async def find_value(self, key: bytes,
+                         use_recent_closest: bool = True) -> Optional[Any]:
         """
         Find a value in the DHT.
         
+        Args:
+            key: The key to look up
+            use_recent_closest: Start from the closest nodes found by a
+                recent lookup of the same key (see _lookup_start)
+        
         Returns the value if found, None otherwise.
         """
         # Check local storage first
         if key in self._storage:
             return self._storage[key]
         
-        result = await self._iterative_lookup(key, find_value=True)
+        result = await self._iterative_lookup(key, find_value=True,
+                                              use_recent=use_recent_closest)
         return result.value if result.found else None
     
     async def store(self, key: bytes, value: Any) -> bool:
@@ -290,12 +397,15 @@ class KademliaNode:
         logger.info(f"Announced file to {successful}/{len(closest_nodes)} nodes")
         return successful
     
-    async def get_peers(self, info_hash: bytes) -> List[Tuple[str, int]]:
+    async def get_peers(self, info_hash: bytes,
+                        use_recent_closest: bool = True) -> List[Tuple[str, int]]:
         """
         Find peers who have a specific file.
         
         Args:
             info_hash: SHA-256 hash of the file
+            use_recent_closest: Start from the closest nodes found by a
+                recent lookup of the same key (see _lookup_start)
         
         Returns:
             List of (ip, port) tuples for peers with the file
@@ -308,7 +418,7 @@ class KademliaNode:
                 all_peers.add((ip, port))
         
         # Query the network
-        result = await self._iterative_get_peers(info_hash)
+        result = await self._iterative_get_peers(info_hash, use_recent_closest)
         all_peers.update(result)
         
         return list(all_peers)
@@ -328,7 +438,7 @@ class KademliaNode:
             ip=addr[0],
             port=addr[1],
         )
-        await self.routing_table.add_node(sender_node)
+        self.routing_table.add_node(sender_node)
         
         # Route to appropriate handler
         handlers = {
@@ -347,21 +457,21 @@ class KademliaNode:
         return None
     
     async def _handle_ping(self, message: Message, 
-                          addr: Tuple[str, int]) -> Message:
-        """Handle PING request."""
-        return create_pong(self.node_id, message)
+                          addr: Tuple[str, int]) -> None:
+        """Handle PING request (the protocol has already sent the PONG)."""
+        return None
     
     async def _handle_find_node(self, message: Message,
                                 addr: Tuple[str, int]) -> Message:
         """Handle FIND_NODE request."""
-        target_id = hex_to_id(message.payload['target_id'])
+        target_id = as_node_id(message.payload['target_id'])
         closest = self.routing_table.find_closest_nodes(target_id)
         return create_find_node_response(self.node_id, message, closest)
     
     async def _handle_find_value(self, message: Message,
                                  addr: Tuple[str, int]) -> Message:
         """Handle FIND_VALUE request."""
-        key = hex_to_id(message.payload['key'])
+        key = as_id(message.payload['key'])
         
         # Check if we have the value
         if key in self._storage:
@@ -380,7 +490,7 @@ class KademliaNode:
     async def _handle_store(self, message: Message,
                            addr: Tuple[str, int]) -> Message:
         """Handle STORE request."""
-        key = hex_to_id(message.payload['key'])
+        key = as_id(message.payload['key'])
         value = message.payload['value']
         
         self._storage[key] = value
@@ -391,7 +501,7 @@ class KademliaNode:
     async def _handle_announce_peer(self, message: Message,
                                     addr: Tuple[str, int]) -> Message:
         """Handle ANNOUNCE_PEER request."""
-        info_hash = hex_to_id(message.payload['info_hash'])
+        info_hash = as_id(message.payload['info_hash'])
         port = message.payload['port']
         
         # Store the peer info
@@ -410,7 +520,7 @@ class KademliaNode:
     async def _handle_get_peers(self, message: Message,
                                 addr: Tuple[str, int]) -> Message:
         """Handle GET_PEERS request."""
-        info_hash = hex_to_id(message.payload['info_hash'])
+        info_hash = as_id(message.payload['info_hash'])
         
         # Check if we have peers for this file
         if info_hash in self._peers:
@@ -427,8 +537,46 @@ class KademliaNode:
             nodes=closest
         )
     
+    def _lookup_start(self, target_id: bytes, use_recent: bool) -> List[NodeInfo]:
+        """
+        Initial shortlist for a lookup, closest first.
+        
+        Our routing table only knows a few nodes near an arbitrary key, so
+        a cold lookup spends several rounds closing in on it. The closest
+        nodes a recent lookup of the same key ended with are merged in,
+        which lets a repeated lookup (e.g. downloading the same file
+        again) query the nodes holding the value in its first round.
+        """
+        closest = self.routing_table.find_closest_nodes(target_id, K)
+        if not use_recent:
+            return closest
+        
+        entry = self._recent_closest.get(target_id)
+        if entry is None:
+            return closest
+        if entry[0] <= time.monotonic():
+            del self._recent_closest[target_id]
+            return closest
+        
+        known = {n.node_id for n in closest}
+        closest.extend(n for n in entry[1] if n.node_id not in known)
+        target = int.from_bytes(target_id, 'big')
+        closest.sort(key=lambda n: target ^ int.from_bytes(n.node_id, 'big'))
+        return closest
+    
+    def _remember_closest(self, target_id: bytes, nodes: List[NodeInfo]):
+        """Keep a finished lookup's closest responding nodes for reuse."""
+        if not nodes:
+            return
+        cache = self._recent_closest
+        cache.pop(target_id, None)
+        if len(cache) >= RECENT_CLOSEST_SIZE:
+            del cache[next(iter(cache))]  # Oldest entry
+        cache[target_id] = (time.monotonic() + RECENT_CLOSEST_TTL, nodes)
+    
     async def _iterative_lookup(self, target_id: bytes, 
-                               find_value: bool = False) -> LookupResult:
+                               find_value: bool = False,
+                               use_recent: bool = True) -> LookupResult:
         """
         Perform iterative lookup for a target ID.
         
@@ -439,15 +587,18 @@ class KademliaNode:
         4. Stop when we've queried the K closest we know of
         """
         # Start with closest nodes we know
-        closest = self.routing_table.find_closest_nodes(target_id, K)
+        closest = self._lookup_start(target_id, use_recent)
         
         if not closest:
             return LookupResult(target_id=target_id, closest_nodes=[])
         
         # Track state
         queried: Set[bytes] = set()
+        responded: List[NodeInfo] = []
         pending: Dict[bytes, NodeInfo] = {n.node_id: n for n in closest}
         found_value = None
+        expected_type = (MessageType.FIND_VALUE_RESPONSE if find_value
+                         else MessageType.FIND_NODE_RESPONSE)
         
         while pending:
             # Select α nodes to query that we haven't queried yet
@@ -461,26 +612,26 @@ class KademliaNode:
             if not to_query:
                 break
             
-            # Send queries in parallel
-            tasks = []
+            # Send queries in parallel (one burst)
+            batch = []
             for node in to_query:
                 queried.add(node.node_id)
                 if find_value:
-                    tasks.append(self._send_find_value(node, target_id))
+                    msg = create_find_value(self.node_id, target_id)
                 else:
-                    tasks.append(self._send_find_node(node, target_id))
+                    msg = create_find_node(self.node_id, target_id)
+                batch.append((msg, node.address))
             
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            responses = await self.protocol.send_batch(batch)
             
             # Process results
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    # Mark node as failed
-                    await self.routing_table.remove_node(to_query[i].node_id)
+            for queried_node, response in zip(to_query, responses):
+                if response is None or response.type != expected_type:
                     continue
                 
-                if result is None:
-                    continue
+                self.routing_table.mark_node_seen(queried_node.node_id)
+                responded.append(queried_node)
+                result = response.payload
                 
                 # Check if we found the value
                 if find_value and result.get('value') is not None:
@@ -489,10 +640,13 @@ class KademliaNode:
                 
                 # Add new nodes to pending
                 for node_dict in result.get('nodes', []):
-                    node = NodeInfo.from_dict(node_dict)
+                    try:
+                        node = NodeInfo.from_dict(node_dict)
+                    except ValueError:
+                        continue  # Malformed node ID; skip just this entry
                     if node.node_id not in queried:
                         pending[node.node_id] = node
-                        await self.routing_table.add_node(node)
+                        self.routing_table.add_node(node)
             
             if found_value is not None:
                 break
@@ -512,6 +666,9 @@ class KademliaNode:
         final_closest.sort(key=lambda n: xor_distance(target_id, n.node_id))
         final_closest = final_closest[:K]
         
+        responded.sort(key=lambda n: xor_distance(target_id, n.node_id))
+        self._remember_closest(target_id, responded[:K])
+        
         return LookupResult(
             target_id=target_id,
             closest_nodes=final_closest,
@@ -519,30 +676,6 @@ class KademliaNode:
             found=found_value is not None,
         )
     
-    async def _send_find_node(self, node: NodeInfo, 
-                             target_id: bytes) -> Optional[Dict]:
-        """Send FIND_NODE to a specific node."""
-        msg = create_find_node(self.node_id, target_id)
-        response = await self.protocol.send_request(msg, node.address)
-        
-        if response and response.type == MessageType.FIND_NODE_RESPONSE:
-            await self.routing_table.mark_node_seen(node.node_id)
-            return response.payload
-        
-        return None
-    
-    async def _send_find_value(self, node: NodeInfo,
-                               key: bytes) -> Optional[Dict]:
-        """Send FIND_VALUE to a specific node."""
-        msg = create_find_value(self.node_id, key)
-        response = await self.protocol.send_request(msg, node.address)
-        
-        if response and response.type == MessageType.FIND_VALUE_RESPONSE:
-            await self.routing_table.mark_node_seen(node.node_id)
-            return response.payload
-        
-        return None
-    
     async def _store_on_node(self, node: NodeInfo, key: bytes, 
                             value: Any) -> bool:
         """Store a key-value pair on a specific node."""
@@ -565,17 +698,19 @@ class KademliaNode:
         
         return False
     
-    async def _iterative_get_peers(self, info_hash: bytes) -> Set[Tuple[str, int]]:
+    async def _iterative_get_peers(self, info_hash: bytes,
+                                   use_recent: bool = True) -> Set[Tuple[str, int]]:
         """Find peers for a file through iterative lookup."""
         all_peers = set()
         
         # Similar to iterative lookup but for peers
-        closest = self.routing_table.find_closest_nodes(info_hash, K)
+        closest = self._lookup_start(info_hash, use_recent)
         
         if not closest:
             return all_peers
         
         queried: Set[bytes] = set()
+        responded: List[NodeInfo] = []
         pending: Dict[bytes, NodeInfo] = {n.node_id: n for n in closest}
         
         while pending:
@@ -589,42 +724,40 @@ class KademliaNode:
             if not to_query:
                 break
             
-            tasks = []
+            batch = []
             for node in to_query:
                 queried.add(node.node_id)
-                tasks.append(self._send_get_peers(node, info_hash))
+                batch.append((create_get_peers(self.node_id, info_hash), node.address))
             
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            responses = await self.protocol.send_batch(batch)
             
-            for i, result in enumerate(results):
-                if isinstance(result, Exception) or result is None:
+            for queried_node, response in zip(to_query, responses):
+                if response is None or response.type != MessageType.GET_PEERS_RESPONSE:
                     continue
                 
+                responded.append(queried_node)
+                result = response.payload
+                
                 # Collect peers
                 for peer in result.get('peers', []):
                     all_peers.add((peer['ip'], peer['port']))
                 
                 # Add new nodes
                 for node_dict in result.get('nodes', []):
-                    node = NodeInfo.from_dict(node_dict)
+                    try:
+                        node = NodeInfo.from_dict(node_dict)
+                    except ValueError:
+                        continue  # Malformed node ID; skip just this entry
                     if node.node_id not in queried:
                         pending[node.node_id] = node
             
             for node in to_query:
                 pending.pop(node.node_id, None)
         
-        return all_peers
-    
-    async def _send_get_peers(self, node: NodeInfo,
-                              info_hash: bytes) -> Optional[Dict]:
-        """Send GET_PEERS to a specific node."""
-        msg = create_get_peers(self.node_id, info_hash)
-        response = await self.protocol.send_request(msg, node.address)
+        responded.sort(key=lambda n: xor_distance(info_hash, n.node_id))
+        self._remember_closest(info_hash, responded[:K])
         
-        if response and response.type == MessageType.GET_PEERS_RESPONSE:
-            return response.payload
-        
-        return None
+        return all_peers
     
     async def _periodic_refresh(self):
         """Periodically refresh routing table and republish data."""
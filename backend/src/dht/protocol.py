@@ -10,12 +10,14 @@ Options Considered:
 3. MessagePack - Compact, flexible, no compilation
 4. Custom binary - Most compact, hardest to maintain
 
-Decision: JSON over UDP
-- Simple to implement and debug
-- Human readable for development
-- Size overhead acceptable for LAN
+Decision: MessagePack over UDP (originally JSON)
+- No compilation step, same flexibility as JSON
+- IDs and hashes travel as native bin fields instead of hex strings,
+  roughly halving ID-heavy packets like FIND_NODE_RESPONSE
+- Every datagram starts with a one-byte wire version so formats can
+  coexist during a rollout; legacy JSON datagrams (which start with
+  '{') are still accepted on receive
 - Easy to extend with new message types
-- Can upgrade to MessagePack later if needed
 
 Message Types (following Kademlia paper):
 - PING: Check if node is alive
@@ -26,20 +28,30 @@ Message Types (following Kademlia paper):
 - ANNOUNCE_PEER: Announce we have a file
 """
 
-import json
 import asyncio
 import struct
-import time
 from enum import Enum
 from dataclasses import dataclass, field, asdict
 from typing import Optional, List, Dict, Any, Callable, Awaitable, Tuple
 import logging
 
-from .utils import ID_BYTES, generate_node_id, id_to_hex, hex_to_id
+import msgpack
+
+from .utils import ID_BYTES, generate_node_id, id_to_hex, hex_to_id, as_node_id
 from .routing import NodeInfo
 
 logger = logging.getLogger(__name__)
 
+# Legacy JSON datagrams are only decoded now; prefer orjson for that
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+# First byte of every datagram we send
+WIRE_VERSION = 1
+_WIRE_PREFIX = bytes([WIRE_VERSION])
+
 
 class MessageType(Enum):
     """DHT Protocol message types."""
@@ -68,7 +80,22 @@ class MessageType(Enum):
     GET_PEERS_RESPONSE = "GET_PEERS_RESPONSE"
 
 
-@dataclass
+# Plain dict lookup for decoding; MessageType(value) goes through
+# EnumMeta.__call__ on every datagram
+_TYPE_BY_VALUE: Dict[str, MessageType] = {m.value: m for m in MessageType}
+
+# Types that answer one of our requests; anything else is a new request
+RESPONSE_TYPES = frozenset({
+    MessageType.PONG,
+    MessageType.FIND_NODE_RESPONSE,
+    MessageType.FIND_VALUE_RESPONSE,
+    MessageType.STORE_RESPONSE,
+    MessageType.ANNOUNCE_RESPONSE,
+    MessageType.GET_PEERS_RESPONSE,
+})
+
+
+@dataclass(slots=True)
 class Message:
     """
     A DHT protocol message.
@@ -78,32 +105,61 @@ class Message:
     - sender_id: Who sent it (node ID)
     - message_id: Unique ID for request/response matching
     - payload: Type-specific data
+    
+    The serialized form is cached on first send, so a message can be
+    re-sent without encoding it again. Don't modify a message after it
+    has been sent.
     """
     type: MessageType
     sender_id: bytes
     message_id: bytes = field(default_factory=lambda: generate_node_id()[:8])
     payload: Dict[str, Any] = field(default_factory=dict)
+    _encoded: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
     
     def to_bytes(self) -> bytes:
         """Serialize message to bytes for transmission."""
+        if self._encoded is not None:
+            return self._encoded
+        
         data = {
-            'type': self.type.value,
-            'sender_id': self.sender_id.hex(),
-            'message_id': self.message_id.hex(),
-            'payload': self.payload,
+            't': self.type.value,
+            's': self.sender_id,
+            'm': self.message_id,
+            'p': self.payload,
         }
-        return json.dumps(data).encode('utf-8')
+        self._encoded = _WIRE_PREFIX + msgpack.packb(data, use_bin_type=True)
+        return self._encoded
     
     @classmethod
     def from_bytes(cls, data: bytes) -> 'Message':
-        """Deserialize message from bytes."""
-        parsed = json.loads(data.decode('utf-8'))
-        return cls(
-            type=MessageType(parsed['type']),
-            sender_id=bytes.fromhex(parsed['sender_id']),
-            message_id=bytes.fromhex(parsed['message_id']),
-            payload=parsed.get('payload', {}),
-        )
+        """
+        Deserialize message from bytes.
+        
+        Raises:
+            ValueError: If the wire version is unknown, or the sender ID
+                isn't ID_BYTES long
+            KeyError: If the message type is unknown
+        """
+        if data[:1] == _WIRE_PREFIX:
+            parsed = msgpack.unpackb(data[1:], raw=False)
+            return cls(
+                type=_TYPE_BY_VALUE[parsed['t']],
+                sender_id=as_node_id(parsed['s']),
+                message_id=parsed['m'],
+                payload=parsed.get('p', {}),
+            )
+        
+        if data[:1] == b'{':
+            # Legacy JSON format (payload IDs are hex strings)
+            parsed = _json_loads(data)
+            return cls(
+                type=_TYPE_BY_VALUE[parsed['type']],
+                sender_id=as_node_id(parsed['sender_id']),
+                message_id=bytes.fromhex(parsed['message_id']),
+                payload=parsed.get('payload', {}),
+            )
+        
+        raise ValueError(f"Unknown wire version: {data[:1]!r}")
     
     def create_response(self, response_type: MessageType, payload: Dict = None) -> 'Message':
         """Create a response message with the same message_id."""
@@ -123,11 +179,14 @@ class DHTProtocol(asyncio.DatagramProtocol):
     - Sending and receiving UDP datagrams
     - Message serialization/deserialization
     - Request/response correlation
-    - Timeouts for pending requests
+    - Timeouts for pending requests (one loop timer per request)
     
     Design Note: We use asyncio's DatagramProtocol for clean integration
     with the event loop. Each request gets a unique ID and we track
     pending requests with futures.
+    
+    The pending-request table is only touched from the event loop thread
+    and never across an await, so it needs no lock.
     """
     
     # Default timeout for requests
@@ -145,40 +204,40 @@ class DHTProtocol(asyncio.DatagramProtocol):
         self.node_id = node_id
         self.on_message = on_message
         self.transport: Optional[asyncio.DatagramTransport] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         
-        # Track pending requests: message_id -> (future, timestamp)
-        self._pending: Dict[bytes, Tuple[asyncio.Future, float]] = {}
-        self._pending_lock = asyncio.Lock()
-        
-        # Cleanup task for timed-out requests
-        self._cleanup_task: Optional[asyncio.Task] = None
+        # Track pending requests: message_id -> (future, timeout timer)
+        self._pending: Dict[bytes, Tuple[asyncio.Future, asyncio.TimerHandle]] = {}
     
     def connection_made(self, transport: asyncio.DatagramTransport):
         """Called when the UDP socket is ready."""
         self.transport = transport
+        self._loop = asyncio.get_running_loop()
         logger.info(f"DHT Protocol ready on {transport.get_extra_info('sockname')}")
-        
-        # Start cleanup task
-        self._cleanup_task = asyncio.create_task(self._cleanup_pending())
     
     def connection_lost(self, exc):
         """Called when the socket is closed."""
         logger.info("DHT Protocol connection lost")
-        if self._cleanup_task:
-            self._cleanup_task.cancel()
     
     def datagram_received(self, data: bytes, addr: Tuple[str, int]):
         """
         Called when a UDP datagram is received.
         
         Handles both incoming requests and responses to our requests.
+        Routing is by message type: a peer's request whose random ID happens
+        to match one of our pending requests must not be taken as the answer.
         """
         try:
             message = Message.from_bytes(data)
             
-            # Check if this is a response to a pending request
-            if message.message_id in self._pending:
-                asyncio.create_task(self._handle_response(message))
+            if message.type in RESPONSE_TYPES:
+                self._handle_response(message)
+            elif message.type is MessageType.PING:
+                # Answer liveness checks right away rather than after the
+                # callback's routing-table update; the callback still runs
+                # so the sender is recorded, but has nothing to reply
+                self.send_message(create_pong(self.node_id, message), addr)
+                asyncio.create_task(self._handle_request(message, addr))
             else:
                 # It's a new incoming request
                 asyncio.create_task(self._handle_request(message, addr))
@@ -190,13 +249,14 @@ class DHTProtocol(asyncio.DatagramProtocol):
         """Called when a send or receive operation fails."""
         logger.error(f"DHT Protocol error: {exc}")
     
-    async def _handle_response(self, message: Message):
+    def _handle_response(self, message: Message):
         """Handle a response to one of our requests."""
-        async with self._pending_lock:
-            if message.message_id in self._pending:
-                future, _ = self._pending.pop(message.message_id)
-                if not future.done():
-                    future.set_result(message)
+        entry = self._pending.pop(message.message_id, None)
+        if entry:
+            future, timer = entry
+            timer.cancel()
+            if not future.done():
+                future.set_result(message)
     
     async def _handle_request(self, message: Message, addr: Tuple[str, int]):
         """Handle an incoming request and send response."""
@@ -209,35 +269,37 @@ class DHTProtocol(asyncio.DatagramProtocol):
         except Exception as e:
             logger.error(f"Error handling request from {addr}: {e}")
     
-    async def _cleanup_pending(self):
-        """Periodically clean up timed-out requests."""
-        while True:
-            try:
-                await asyncio.sleep(1.0)
-                now = time.time()
-                
-                async with self._pending_lock:
-                    timed_out = []
-                    for msg_id, (future, timestamp) in self._pending.items():
-                        if now - timestamp > self.REQUEST_TIMEOUT:
-                            timed_out.append(msg_id)
-                    
-                    for msg_id in timed_out:
-                        future, _ = self._pending.pop(msg_id)
-                        if not future.done():
-                            future.set_exception(asyncio.TimeoutError())
-                            
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Error in cleanup task: {e}")
-    
     def send_message(self, message: Message, addr: Tuple[str, int]):
         """Send a message to an address (fire and forget)."""
         if self.transport:
             data = message.to_bytes()
             self.transport.sendto(data, addr)
     
+    def _on_timeout(self, message_id: bytes):
+        """Fail a pending request whose response never arrived."""
+        entry = self._pending.pop(message_id, None)
+        if entry:
+            future, _ = entry
+            if not future.done():
+                future.set_exception(asyncio.TimeoutError())
+    
+    def _register_pending(self, message_id: bytes,
+                          timeout: float = None) -> asyncio.Future:
+        """Track a future to be resolved by the response to message_id."""
+        future = self._loop.create_future()
+        timer = self._loop.call_later(timeout or self.REQUEST_TIMEOUT,
+                                self._on_timeout, message_id)
+        self._pending[message_id] = (future, timer)
+        return future
+    
+    @staticmethod
+    async def _await_response(future: asyncio.Future) -> Optional[Message]:
+        """Wait for a registered response, or None if it timed out."""
+        try:
+            return await future
+        except asyncio.TimeoutError:
+            return None
+    
     async def send_request(self, message: Message, addr: Tuple[str, int], 
                           timeout: float = None) -> Optional[Message]:
         """
@@ -254,26 +316,39 @@ class DHTProtocol(asyncio.DatagramProtocol):
         if not self.transport:
             raise RuntimeError("Protocol not connected")
         
-        # Create a future for the response
-        future = asyncio.get_event_loop().create_future()
-        
-        async with self._pending_lock:
-            self._pending[message.message_id] = (future, time.time())
+        future = self._register_pending(message.message_id, timeout)
         
-        # Send the message
         self.send_message(message, addr)
         
-        # Wait for response
-        try:
-            return await asyncio.wait_for(
-                future, 
-                timeout=timeout or self.REQUEST_TIMEOUT
-            )
-        except asyncio.TimeoutError:
-            # Clean up if not already done
-            async with self._pending_lock:
-                self._pending.pop(message.message_id, None)
-            return None
+        return await self._await_response(future)
+    
+    async def send_batch(self, requests: List[Tuple[Message, Tuple[str, int]]],
+                         timeout: float = None) -> List[Optional[Message]]:
+        """
+        Send several requests at once and wait for all responses.
+        
+        Every response future is registered before the first datagram goes
+        out, then all datagrams are written back-to-back with no awaits in
+        between, so a lookup's fan-out leaves in one burst.
+        
+        Args:
+            requests: (message, addr) pairs
+            timeout: Optional custom timeout (per request)
+        
+        Returns:
+            Responses in request order (None where a request timed out)
+        """
+        if not self.transport:
+            raise RuntimeError("Protocol not connected")
+        
+        futures = [self._register_pending(message.message_id, timeout)
+                   for message, _ in requests]
+        
+        sendto = self.transport.sendto
+        for message, addr in requests:
+            sendto(message.to_bytes(), addr)
+        
+        return await asyncio.gather(*map(self._await_response, futures))
 
 
 # Helper functions for creating specific message types
@@ -297,7 +372,7 @@ def create_find_node(sender_id: bytes, target_id: bytes) -> Message:
     return Message(
         type=MessageType.FIND_NODE,
         sender_id=sender_id,
-        payload={'target_id': target_id.hex()},
+        payload={'target_id': target_id},
     )
 
 
@@ -318,7 +393,7 @@ def create_store(sender_id: bytes, key: bytes, value: Any) -> Message:
         type=MessageType.STORE,
         sender_id=sender_id,
         payload={
-            'key': key.hex(),
+            'key': key,
             'value': value,
         },
     )
@@ -340,7 +415,7 @@ def create_find_value(sender_id: bytes, key: bytes) -> Message:
     return Message(
         type=MessageType.FIND_VALUE,
         sender_id=sender_id,
-        payload={'key': key.hex()},
+        payload={'key': key},
     )
 
 
@@ -369,7 +444,7 @@ def create_announce_peer(sender_id: bytes, info_hash: bytes,
         type=MessageType.ANNOUNCE_PEER,
         sender_id=sender_id,
         payload={
-            'info_hash': info_hash.hex(),
+            'info_hash': info_hash,
             'port': port,
         },
     )
@@ -380,7 +455,7 @@ def create_get_peers(sender_id: bytes, info_hash: bytes) -> Message:
     return Message(
         type=MessageType.GET_PEERS,
         sender_id=sender_id,
-        payload={'info_hash': info_hash.hex()},
+        payload={'info_hash': info_hash},
     )
 
 
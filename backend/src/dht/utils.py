@@ -70,8 +70,8 @@ def xor_distance(id1: bytes, id2: bytes) -> int:
     assert len(id1) == ID_BYTES and len(id2) == ID_BYTES, \
         f"Node IDs must be {ID_BYTES} bytes"
     
-    # XOR byte by byte and convert to integer
-    return bytes_to_int(bytes(a ^ b for a, b in zip(id1, id2)))
+    # One wide integer XOR instead of a per-byte Python loop
+    return int.from_bytes(id1, 'big') ^ int.from_bytes(id2, 'big')
 
 
 def bytes_to_int(b: bytes) -> int:
@@ -121,6 +121,32 @@ def hex_to_id(hex_str: str) -> bytes:
     return bytes.fromhex(hex_str)
 
 
+def as_id(value) -> bytes:
+    """
+    Normalize an ID taken from a message payload.
+    
+    IDs travel as raw bytes on the wire, but peers still speaking the
+    legacy JSON format send them as hex strings.
+    """
+    if isinstance(value, str):
+        return bytes.fromhex(value)
+    return bytes(value)
+
+
+def as_node_id(value) -> bytes:
+    """
+    Normalize a node ID taken from a message (see as_id).
+    
+    Raises:
+        ValueError: If it isn't ID_BYTES long; the routing table's
+            lookup indexes assume every ID is
+    """
+    node_id = as_id(value)
+    if len(node_id) != ID_BYTES:
+        raise ValueError(f"Bad node ID length: {len(node_id)}")
+    return node_id
+
+
 def get_shared_prefix_length(id1: bytes, id2: bytes) -> int:
     """
     Calculate how many leading bits are shared between two IDs.
@@ -239,6 +239,11 @@ class BroadcastDiscovery:
                 except Exception as e:
                     logger.error(f"Callback error: {e}")
     
+    async def probe(self):
+        """Ask peers on the LAN to announce themselves now."""
+        if self._running:
+            await self._send_discover()
+    
     async def _send_discover(self):
         """Send a discovery request."""
         message = {
@@ -14,6 +14,9 @@ from .broadcast import BroadcastDiscovery
 
 logger = logging.getLogger(__name__)
 
+# First round of discover()'s wait; each later round doubles it
+INITIAL_PROBE_WAIT = 0.5
+
 
 class DiscoveryManager:
     """
@@ -44,6 +47,9 @@ class DiscoveryManager:
         self._peers: Dict[str, DiscoveredPeer] = {}
         self._callbacks: List[PeerCallback] = []
         
+        # Set whenever a new peer is added (wakes discover())
+        self._peer_added = asyncio.Event()
+        
         # Wire up internal callbacks
         self._mdns.on_peer_change(self._on_mdns_peer)
         self._broadcast.on_peer_change(self._on_broadcast_peer)
@@ -92,20 +98,51 @@ class DiscoveryManager:
         self._peers.clear()
         logger.info("Peer discovery stopped")
     
-    async def discover(self, timeout: float = 3.0) -> List[DiscoveredPeer]:
+    async def discover(self, timeout: float = 3.0, min_peers: int = 1,
+                       min_timeout: float = 0.05) -> List[DiscoveredPeer]:
         """
-        Actively discover peers for a period of time.
+        Actively discover peers until enough have answered.
         
-        Useful for initial bootstrap.
+        Useful for initial bootstrap. LAN peers answer within milliseconds,
+        so this returns as soon as min_peers are known instead of always
+        waiting out the timeout. Waits in rounds starting at
+        INITIAL_PROBE_WAIT and doubling; a round that finds nothing
+        re-sends the broadcast probe, since a single UDP broadcast can
+        be lost.
         
         Args:
-            timeout: How long to wait for discovery
+            timeout: Longest to wait for discovery
+            min_peers: Return once this many peers are known
+            min_timeout: Always wait at least this long, so peers that
+                answer together are returned together
         
         Returns:
             List of discovered peers
         """
-        logger.info(f"Discovering peers for {timeout}s...")
-        await asyncio.sleep(timeout)
+        logger.info(f"Discovering peers (up to {timeout}s)...")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        
+        await asyncio.sleep(min(min_timeout, timeout))
+        
+        round_wait = INITIAL_PROBE_WAIT
+        round_end = loop.time() + round_wait
+        while len(self._peers) < min_peers:
+            now = loop.time()
+            if now >= deadline:
+                break
+            if now >= round_end:
+                await self._broadcast.probe()
+                round_wait *= 2
+                round_end = now + round_wait
+            
+            self._peer_added.clear()
+            try:
+                await asyncio.wait_for(self._peer_added.wait(),
+                                       min(round_end, deadline) - now)
+            except asyncio.TimeoutError:
+                pass
+        
         peers = self.get_peers()
         logger.info(f"Discovered {len(peers)} peers")
         return peers
@@ -126,6 +163,8 @@ class DiscoveryManager:
             self._peers[peer.node_id] = peer
             
             if is_new:
+                self._peer_added.set()
+                
                 # Notify callbacks only for new peers
                 for callback in self._callbacks:
                     try:
@@ -43,7 +43,7 @@ logger = logging.getLogger(__name__)
 
 # Try to import zeroconf
 try:
-    from zeroconf import ServiceInfo, Zeroconf, ServiceBrowser, ServiceListener
+    from zeroconf import ServiceInfo, Zeroconf, ServiceBrowser, ServiceListener, ServiceStateChange
     from zeroconf.asyncio import AsyncZeroconf, AsyncServiceInfo, AsyncServiceBrowser
     ZEROCONF_AVAILABLE = True
 except ImportError:
@@ -55,8 +55,15 @@ except ImportError:
 SERVICE_TYPE = "_p2pshare._udp.local."
 SERVICE_NAME_PREFIX = "P2PNode-"
 
+# Most browser events handled together by the event worker
+MAX_EVENT_BATCH = 16
 
-@dataclass
+# How long to wait for a peer's service info. LAN responders answer well
+# under 100 ms; the zeroconf default of 3 s only mattered for lost packets
+SERVICE_INFO_TIMEOUT_MS = 1000
+
+
+@dataclass(slots=True)
 class DiscoveredPeer:
     """Information about a discovered peer."""
     node_id: str
@@ -98,13 +105,29 @@ class MDNSDiscovery:
         self.dht_port = dht_port
         self.transfer_port = transfer_port
         
+        # Our service instance name, built once
+        self._short_id = node_id[:16]
+        self._service_name = f"{SERVICE_NAME_PREFIX}{self._short_id}.{SERVICE_TYPE}"
+        
         self._zeroconf: Optional['AsyncZeroconf'] = None
         self._service_info: Optional['ServiceInfo'] = None
         self._browser: Optional['AsyncServiceBrowser'] = None
         
         # Discovered peers
         self._peers: Dict[str, DiscoveredPeer] = {}  # node_id -> peer
-        self._callbacks: List[PeerCallback] = []
+        # service name -> (raw address, port, peer) as last decoded
+        self._decoded: Dict[str, Tuple[bytes, int, DiscoveredPeer]] = {}
+        # Replaced (never mutated) on registration, so notifying can iterate
+        # it directly even if a callback registers another
+        self._callbacks: Tuple[PeerCallback, ...] = ()
+        
+        # Browser events are queued and handled by one worker task
+        self._events: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        
+        self._local_ip: Optional[str] = None
+        
+        self._async_request_timeout_ms = SERVICE_INFO_TIMEOUT_MS
         
         self._running = False
     
@@ -115,7 +138,7 @@ class MDNSDiscovery:
     
     def on_peer_change(self, callback: PeerCallback):
         """Register a callback for peer discovery events."""
-        self._callbacks.append(callback)
+        self._callbacks += (callback,)
     
     def get_peers(self) -> List[DiscoveredPeer]:
         """Get list of discovered peers."""
@@ -141,11 +164,9 @@ class MDNSDiscovery:
             self._zeroconf = AsyncZeroconf()
             
             # Create service info for registration
-            service_name = f"{SERVICE_NAME_PREFIX}{self.node_id[:16]}.{SERVICE_TYPE}"
-            
             self._service_info = ServiceInfo(
                 SERVICE_TYPE,
-                service_name,
+                self._service_name,
                 addresses=[socket.inet_aton(local_ip)],
                 port=self.dht_port,
                 properties={
@@ -158,7 +179,9 @@ class MDNSDiscovery:
             
             # Register our service
             await self._zeroconf.async_register_service(self._service_info)
-            logger.info(f"Registered mDNS service: {service_name}")
+            logger.info(f"Registered mDNS service: {self._service_name}")
+            
+            self._worker = asyncio.create_task(self._process_events())
             
             # Create service browser
             self._browser = AsyncServiceBrowser(
@@ -178,6 +201,10 @@ class MDNSDiscovery:
         """Stop mDNS discovery."""
         self._running = False
         
+        if self._worker:
+            self._worker.cancel()
+            self._worker = None
+        
         # Browser cleanup - handle different zeroconf versions
         if self._browser:
             try:
@@ -202,19 +229,23 @@ class MDNSDiscovery:
             self._zeroconf = None
         
         self._peers.clear()
+        self._decoded.clear()
         logger.info("mDNS discovery stopped")
     
     def _get_local_ip(self) -> str:
-        """Get the local IP address (best guess)."""
+        """Get the local IP address (best guess, cached once found)."""
+        if self._local_ip:
+            return self._local_ip
+        
         try:
             # Create a socket and connect to a public address
             # This doesn't actually send data, just determines the route
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            ip = s.getsockname()[0]
-            s.close()
-            return ip
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+                s.connect(("8.8.8.8", 80))
+                self._local_ip = s.getsockname()[0]
+            return self._local_ip
         except Exception:
+            # Not cached, so a later start can still find the network
             return "127.0.0.1"
     
     def _on_service_state_change(self, zeroconf, service_type, name, state_change):
@@ -222,30 +253,67 @@ class MDNSDiscovery:
         if not self._running:
             return
         
-        # Schedule async handling
-        asyncio.create_task(
-            self._handle_service_change(zeroconf, service_type, name, state_change)
-        )
+        # Hand off to the event worker (no task per event)
+        self._events.put_nowait((zeroconf, service_type, name, state_change))
+    
+    async def _process_events(self):
+        """
+        Handle queued browser events.
+        
+        Events that arrive together (e.g. a burst of peers at startup) are
+        handled as one batch, so their service-info requests run
+        concurrently instead of back to back.
+        """
+        while True:
+            try:
+                batch = [await self._events.get()]
+                while len(batch) < MAX_EVENT_BATCH and not self._events.empty():
+                    batch.append(self._events.get_nowait())
+                
+                results = await asyncio.gather(
+                    *(self._handle_service_change(*event) for event in batch),
+                    return_exceptions=True,
+                )
+                for result in results:
+                    if isinstance(result, Exception):
+                        logger.error(f"mDNS event error: {result}")
+            
+            except asyncio.CancelledError:
+                break
     
     async def _handle_service_change(self, zeroconf, service_type, name, state_change):
         """Handle service discovery events."""
-        from zeroconf import ServiceStateChange
-        
         if state_change == ServiceStateChange.Added:
+            # Our own announcement: skip it before requesting its info
+            if name == self._service_name:
+                return
+            
             # Get service info
             info = AsyncServiceInfo(service_type, name)
-            await info.async_request(zeroconf, 3000)
+            await info.async_request(zeroconf, self._async_request_timeout_ms)
             
             if info.addresses:
+                address = info.addresses[0]
+                
+                # Re-announce of a peer we already decoded: just refresh it
+                cached = self._decoded.get(name)
+                if cached and cached[0] == address and cached[1] == info.port:
+                    peer = cached[2]
+                    peer.discovered_at = time.time()
+                    self._peers[peer.node_id] = peer
+                    self._notify(peer, True)
+                    return
+                
                 # Extract peer info
                 node_id = info.properties.get(b'node_id', b'').decode()
-                transfer_port = int(info.properties.get(b'transfer_port', b'0'))
-                ip = socket.inet_ntoa(info.addresses[0])
                 
                 # Skip ourselves
                 if node_id == self.node_id:
                     return
                 
+                transfer_port = int(info.properties.get(b'transfer_port', b'0'))
+                ip = socket.inet_ntoa(address)
+                
                 peer = DiscoveredPeer(
                     node_id=node_id,
                     ip=ip,
@@ -255,29 +323,28 @@ class MDNSDiscovery:
                 )
                 
                 self._peers[node_id] = peer
+                self._decoded[name] = (address, info.port, peer)
                 logger.info(f"mDNS: Discovered peer {node_id[:16]}... at {ip}")
-                
-                # Notify callbacks
-                for callback in self._callbacks:
-                    try:
-                        callback(peer, True)
-                    except Exception as e:
-                        logger.error(f"Callback error: {e}")
+                self._notify(peer, True)
         
         elif state_change == ServiceStateChange.Removed:
-            # Find and remove the peer
-            # Name format: "P2PNode-{id}.{service_type}"
-            for node_id, peer in list(self._peers.items()):
-                if name.startswith(f"{SERVICE_NAME_PREFIX}{node_id[:16]}"):
-                    del self._peers[node_id]
-                    logger.info(f"mDNS: Peer removed {node_id[:16]}...")
-                    
-                    for callback in self._callbacks:
-                        try:
-                            callback(peer, False)
-                        except Exception as e:
-                            logger.error(f"Callback error: {e}")
-                    break
+            # The name -> peer index avoids scanning every known peer
+            cached = self._decoded.pop(name, None)
+            if cached is None:
+                return
+            
+            peer = cached[2]
+            if self._peers.pop(peer.node_id, None) is not None:
+                logger.info(f"mDNS: Peer removed {peer.node_id[:16]}...")
+                self._notify(peer, False)
+    
+    def _notify(self, peer: DiscoveredPeer, added: bool):
+        """Call every registered callback; one failing doesn't stop the rest."""
+        for callback in self._callbacks:
+            try:
+                callback(peer, added)
+            except Exception as e:
+                logger.error(f"Callback error: {e}")
 
 
 # Fallback for when zeroconf is not available
@@ -286,7 +353,7 @@ class MDNSDiscoveryStub:
     
     def __init__(self, *args, **kwargs):
         self._peers = {}
-        self._callbacks = []
+        self._callbacks = ()
     
     @property
     def is_available(self) -> bool:
@@ -27,6 +27,7 @@ Chunking Strategy: Fixed-Size
 """
 
 import os
+import hmac
 import hashlib
 import asyncio
 from pathlib import Path
@@ -36,6 +37,9 @@ import aiofiles
 # Chunk size: 256KB
 CHUNK_SIZE = 256 * 1024  # 262,144 bytes
 
+# Read size when hashing whole files
+FILE_HASH_BUFFER = 1024 * 1024
+
 
 class FileChunker:
     """
@@ -128,28 +132,35 @@ class FileChunker:
         
         This is the 'info_hash' used to identify the file in the DHT.
         """
-        hasher = hashlib.sha256()
-        
-        async with aiofiles.open(file_path, 'rb') as f:
-            while True:
-                chunk = await f.read(self.chunk_size)
-                if not chunk:
-                    break
-                hasher.update(chunk)
-        
-        return hasher.digest()
+        # Hashing releases the GIL, so a thread keeps the event loop free
+        return await asyncio.to_thread(file_sha256, file_path)
     
     def compute_file_hash_sync(self, file_path: Path) -> bytes:
         """Compute SHA-256 hash of entire file (synchronous)."""
-        hasher = hashlib.sha256()
-        
-        with open(file_path, 'rb') as f:
-            while True:
-                chunk = f.read(self.chunk_size)
-                if not chunk:
-                    break
-                hasher.update(chunk)
+        return file_sha256(file_path)
+
+
+def file_sha256(file_path: Path) -> bytes:
+    """
+    SHA-256 of a whole file.
+    
+    hashlib is OpenSSL's SHA-256 (SHA-NI / ARMv8 crypto extensions where
+    the CPU has them), so the cost left in Python is reading. On 3.11+
+    hashlib.file_digest reads into one reused buffer; older versions get
+    the same loop by hand instead of allocating a bytes object per read.
+    """
+    with open(file_path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'sha256').digest()
         
+        hasher = hashlib.sha256()
+        buffer = bytearray(FILE_HASH_BUFFER)
+        view = memoryview(buffer)
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            hasher.update(view[:size])
         return hasher.digest()
 
 
@@ -163,6 +174,20 @@ def hex_to_hash(hex_str: str) -> bytes:
     return bytes.fromhex(hex_str)
 
 
+def digest_matches(digest: bytes, expected_hex: str) -> bool:
+    """
+    Check a raw digest against an expected hash given as hex.
+    
+    Decodes the expected side once instead of hex-encoding the digest,
+    and compares in constant time. Malformed hex never matches.
+    """
+    try:
+        expected = bytes.fromhex(expected_hex)
+    except ValueError:
+        return False
+    return hmac.compare_digest(digest, expected)
+
+
 if __name__ == "__main__":
     import sys
     import asyncio
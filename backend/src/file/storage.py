@@ -41,6 +41,7 @@ data/
 
 import os
 import json
+import mmap
 import asyncio
 import hashlib
 from pathlib import Path
@@ -50,6 +51,7 @@ import aiofiles
 import aiofiles.os
 
 from .manifest import FileManifest
+from .chunker import CHUNK_SIZE, digest_matches
 
 
 @dataclass
@@ -105,34 +107,45 @@ class ChunkStorage:
     
     # === Chunk Operations ===
     
-    async def store_chunk(self, chunk_hash: str, data: bytes) -> bool:
+    async def store_chunk(self, chunk_hash: str, data: bytes,
+                          verified: bool = False) -> bool:
         """
         Store a chunk.
         
         Verifies hash before storing.
         
+        Args:
+            chunk_hash: Expected SHA-256 of the data (hex)
+            data: Chunk data
+            verified: The caller already checked data against chunk_hash,
+                so don't hash it a second time
+        
         Returns:
             True if stored successfully, False if hash mismatch
         """
         # Verify hash
-        actual_hash = hashlib.sha256(data).hexdigest()
-        if actual_hash != chunk_hash:
+        if not verified and not digest_matches(hashlib.sha256(data).digest(), chunk_hash):
             return False
         
-        # Ensure subdirectory exists
-        chunk_path = self._chunk_path(chunk_hash)
-        await aiofiles.os.makedirs(chunk_path.parent, exist_ok=True)
+        # One thread hop for the whole write rather than one per call
+        await asyncio.to_thread(
+            self._write_chunk, self._chunk_path(chunk_hash),
+            self.temp_dir / f"{chunk_hash}.tmp", data
+        )
         
-        # Write atomically (write to temp, then rename)
-        temp_path = self.temp_dir / f"{chunk_hash}.tmp"
+        return True
+    
+    @staticmethod
+    def _write_chunk(chunk_path: Path, temp_path: Path, data: bytes):
+        """Write a chunk atomically (write to temp, then rename)."""
+        # Ensure subdirectory exists
+        os.makedirs(chunk_path.parent, exist_ok=True)
         
-        async with aiofiles.open(temp_path, 'wb') as f:
-            await f.write(data)
+        with open(temp_path, 'wb') as f:
+            f.write(data)
         
         # Rename to final location
-        await aiofiles.os.rename(temp_path, chunk_path)
-        
-        return True
+        os.rename(temp_path, chunk_path)
     
     async def get_chunk(self, chunk_hash: str) -> Optional[bytes]:
         """
@@ -150,14 +163,23 @@ class ChunkStorage:
             data = await f.read()
         
         # Verify hash
-        actual_hash = hashlib.sha256(data).hexdigest()
-        if actual_hash != chunk_hash:
+        if not digest_matches(hashlib.sha256(data).digest(), chunk_hash):
             # Corrupted chunk, remove it
             await aiofiles.os.remove(chunk_path)
             return None
         
         return data
     
+    def chunk_file(self, chunk_hash: str) -> Optional[Path]:
+        """
+        Path of a stored chunk's file, or None if we don't have it.
+        
+        For sending the file directly (zero-copy). Unlike get_chunk this
+        doesn't verify the hash; receivers verify every chunk anyway.
+        """
+        chunk_path = self._chunk_path(chunk_hash)
+        return chunk_path if chunk_path.exists() else None
+    
     async def has_chunk(self, chunk_hash: str) -> bool:
         """Check if a chunk exists in storage."""
         return self._chunk_path(chunk_hash).exists()
@@ -186,8 +208,7 @@ class ChunkStorage:
         with open(chunk_path, 'rb') as f:
             data = f.read()
         
-        actual_hash = hashlib.sha256(data).hexdigest()
-        if actual_hash != chunk_hash:
+        if not digest_matches(hashlib.sha256(data).digest(), chunk_hash):
             chunk_path.unlink()
             return None
         
@@ -204,8 +225,9 @@ class ChunkStorage:
         """
         manifest_path = self._manifest_path(manifest.info_hash)
         
-        async with aiofiles.open(manifest_path, 'w') as f:
-            await f.write(manifest.to_json(indent=2))
+        # Compact, the same bytes that go to the DHT and to peers
+        async with aiofiles.open(manifest_path, 'wb') as f:
+            await f.write(manifest.to_bytes())
         
         return manifest.info_hash
     
@@ -221,11 +243,26 @@ class ChunkStorage:
         if not manifest_path.exists():
             return None
         
-        async with aiofiles.open(manifest_path, 'r') as f:
+        async with aiofiles.open(manifest_path, 'rb') as f:
             data = await f.read()
         
         return FileManifest.from_json(data)
     
+    async def get_manifest_bytes(self, info_hash: str) -> Optional[bytes]:
+        """
+        A stored manifest's JSON as is, without parsing it.
+        
+        Returns:
+            UTF-8 encoded JSON, or None if not found
+        """
+        manifest_path = self._manifest_path(info_hash)
+        
+        if not manifest_path.exists():
+            return None
+        
+        async with aiofiles.open(manifest_path, 'rb') as f:
+            return await f.read()
+    
     async def has_manifest(self, info_hash: str) -> bool:
         """Check if a manifest exists."""
         return self._manifest_path(info_hash).exists()
@@ -246,7 +283,7 @@ class ChunkStorage:
         
         for manifest_file in self.manifests_dir.glob("*.json"):
             try:
-                async with aiofiles.open(manifest_file, 'r') as f:
+                async with aiofiles.open(manifest_file, 'rb') as f:
                     data = await f.read()
                 manifests.append(FileManifest.from_json(data))
             except Exception:
@@ -256,13 +293,15 @@ class ChunkStorage:
     
     # === File Operations ===
     
-    async def store_file(self, file_path: Path, manifest: FileManifest = None) -> FileManifest:
+    async def store_file(self, file_path: Path, manifest: FileManifest = None,
+                        chunk_size: int = CHUNK_SIZE) -> FileManifest:
         """
         Store a complete file (chunk it and store all chunks).
         
         Args:
             file_path: Path to the file to store
             manifest: Optional pre-computed manifest
+            chunk_size: Chunk size used when creating the manifest
         
         Returns:
             The file's manifest
@@ -274,7 +313,7 @@ class ChunkStorage:
         
         # Create manifest if not provided
         if manifest is None:
-            manifest = await create_manifest(file_path)
+            manifest = await create_manifest(file_path, chunk_size=chunk_size)
         
         # Store manifest
         await self.store_manifest(manifest)
@@ -284,7 +323,7 @@ class ChunkStorage:
         
         async for index, data, hash_bytes in chunker.chunk_file(file_path):
             chunk_hash = hash_bytes.hex()
-            await self.store_chunk(chunk_hash, data)
+            await self.store_chunk(chunk_hash, data, verified=True)
         
         return manifest
     
@@ -310,29 +349,19 @@ class ChunkStorage:
             if not await self.has_chunk(chunk_info.hash):
                 return None
         
-        # Write to temp file first
+        # Write to temp file first (in a thread: it's all blocking I/O and
+        # hashing, which releases the GIL)
         temp_path = self.temp_dir / f"{manifest.info_hash}.tmp"
         
-        async with aiofiles.open(temp_path, 'wb') as f:
-            for chunk_info in manifest.chunks:
-                chunk_data = await self.get_chunk(chunk_info.hash)
-                if chunk_data is None:
-                    # Chunk disappeared
-                    await aiofiles.os.remove(temp_path)
-                    return None
-                await f.write(chunk_data)
-        
-        # Verify file hash
-        file_hasher = hashlib.sha256()
-        async with aiofiles.open(temp_path, 'rb') as f:
-            while True:
-                data = await f.read(256 * 1024)
-                if not data:
-                    break
-                file_hasher.update(data)
-        
-        if file_hasher.hexdigest() != manifest.info_hash:
+        file_hash = await asyncio.to_thread(self._assemble, manifest, temp_path)
+        
+        if file_hash != manifest.info_hash:
             await aiofiles.os.remove(temp_path)
+            if file_hash is not None:
+                # Find and drop the corrupted chunk(s) (get_chunk verifies),
+                # so they are downloaded again
+                for chunk_info in manifest.chunks:
+                    await self.get_chunk(chunk_info.hash)
             return None
         
         # Move to final location
@@ -341,6 +370,63 @@ class ChunkStorage:
         
         return output_path
     
+    def _assemble(self, manifest: FileManifest, temp_path: Path) -> Optional[str]:
+        """
+        Copy a file's chunks into temp_path and hash the result.
+        
+        The file is allocated at its final size and memory-mapped; each
+        chunk file is read straight into its slot of the map, and the
+        whole map is hashed in one call. No chunk passes through a Python
+        bytes object and there are no write calls. Chunks aren't verified
+        one by one: the file hash covers them all.
+        
+        Returns:
+            The file's SHA-256 (hex), or None if a chunk is missing
+        """
+        with open(temp_path, 'wb+') as out:
+            if manifest.size == 0:
+                return hashlib.sha256().hexdigest()
+            
+            if hasattr(os, 'posix_fallocate'):
+                os.posix_fallocate(out.fileno(), 0, manifest.size)
+            else:
+                out.truncate(manifest.size)
+            
+            with mmap.mmap(out.fileno(), manifest.size) as mapped:
+                view = memoryview(mapped)
+                try:
+                    for chunk_info in manifest.chunks:
+                        start = chunk_info.offset
+                        slot = view[start:start + chunk_info.size]
+                        try:
+                            with open(self._chunk_path(chunk_info.hash), 'rb') as f:
+                                read = f.readinto(slot)
+                        except FileNotFoundError:
+                            return None  # Chunk disappeared
+                        finally:
+                            slot.release()
+                        if read != chunk_info.size:
+                            return None
+                    
+                    # Shared mapping: the pages reach the file on unmap,
+                    # like the plain writes used before (neither fsyncs)
+                    return hashlib.sha256(view).hexdigest()
+                finally:
+                    view.release()
+    
+    def chunk_bitfield(self, manifest: FileManifest) -> bytes:
+        """
+        Which of a file's chunks we have, as a bitfield.
+        
+        Bit i (most significant bit of byte 0 first) is set if we have
+        chunk i of the manifest.
+        """
+        bitfield = bytearray((manifest.chunk_count + 7) // 8)
+        for chunk_info in manifest.chunks:
+            if self.has_chunk_sync(chunk_info.hash):
+                bitfield[chunk_info.index >> 3] |= 0x80 >> (chunk_info.index & 7)
+        return bytes(bitfield)
+    
     async def get_missing_chunks(self, manifest: FileManifest) -> List[str]:
         """
         Get list of chunk hashes we don't have for a file.
@@ -9,29 +9,53 @@ This is the main entry point that orchestrates all components:
 """
 
 import asyncio
-import hashlib
+import json
 import logging
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, List, Tuple, Callable
+from typing import Optional, List, Dict, Tuple, Callable, Union
 from dataclasses import dataclass
 
 from .dht import KademliaNode, generate_node_id, id_to_hex
-from .file import ChunkStorage, FileManifest, create_manifest
+from .file import ChunkStorage, FileManifest, create_manifest, CHUNK_SIZE
 from .transfer import ChunkUploader, FileDownloader, TransferServer
 from .discovery import DiscoveryManager, DiscoveredPeer
+from .storage import Database, init_database
 
 logger = logging.getLogger(__name__)
 
+# Upper bound for auto-tuned chunk sizes (transfer messages are capped at 100MB)
+MAX_CHUNK_SIZE = 16 * 1024 * 1024
+
+# Most info_hash lookups (manifest + peers) kept in the DHT lookup cache
+LOOKUP_CACHE_SIZE = 1024
+
+# Most saved peers used to rejoin the DHT on startup
+SEED_PEER_LIMIT = 64
+
+# Manifest fetches: peers asked at once, and how long each attempt may take
+MANIFEST_FETCH_FANOUT = 3
+MANIFEST_FETCH_TIMEOUT = 2.0
+
+# A shared file is announced to the DHT at most once per period (seconds);
+# the DHT republishes stored data hourly as well
+ANNOUNCE_PERIOD = 3600
+
 
 def info_hash_to_dht_key(info_hash: str) -> bytes:
     """
     Convert a SHA-256 info_hash (32 bytes) to a DHT key (20 bytes).
     
     Kademlia uses 160-bit (20 byte) keys, but SHA-256 produces 256-bit (32 byte) hashes.
-    We use SHA-1 of the info_hash to get a 20-byte key.
+    We use the first 20 bytes of the info_hash. SHA-256 output is
+    uniformly distributed, so any 160 bits of it are too, which is all
+    the XOR metric needs; hashing it again (formerly with SHA-1) added
+    nothing but a hash call per lookup.
     """
-    info_hash_bytes = bytes.fromhex(info_hash)
-    return hashlib.sha1(info_hash_bytes).digest()
+    return bytes.fromhex(info_hash)[:20]
 
 
 @dataclass
@@ -51,6 +75,15 @@ class NodeConfig:
     # Bootstrap
     bootstrap_nodes: List[Tuple[str, int]] = None
     auto_discover: bool = True  # Use mDNS/broadcast discovery
+    
+    # Transfer tuning
+    chunk_size: int = CHUNK_SIZE  # Chunk size for files we share
+    max_concurrent_downloads: int = 8  # Starting point; auto-tuned per file
+    min_concurrency: int = 2
+    max_concurrency: int = 64
+    
+    # Seconds a DHT lookup result (manifest + peers) is reused for
+    dht_cache_ttl: float = 300.0
 
 
 class P2PNode:
@@ -97,7 +130,9 @@ class P2PNode:
         
         self.downloader = FileDownloader(
             storage=self.storage,
-            max_concurrent=5
+            max_concurrent=self.config.max_concurrent_downloads,
+            min_concurrency=self.config.min_concurrency,
+            max_concurrency=self.config.max_concurrency,
         )
         
         self.discovery = DiscoveryManager(
@@ -106,9 +141,28 @@ class P2PNode:
             transfer_port=self.config.transfer_port
         )
         
+        # Metadata database (opened in start); it keeps the routing table
+        # snapshot used to rejoin the network on the next start
+        self.db: Optional[Database] = None
+        
         # State
         self._running = False
         
+        # Default executor we installed last (see start)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        
+        # dht_key -> (expires_at (monotonic), manifest_json, peers), LRU order.
+        # Manifests are stored as bytes (FileManifest.to_bytes); values put
+        # there by older nodes are JSON strings
+        self._lookup_cache: OrderedDict[
+            bytes, Tuple[float, Optional[Union[str, bytes]], list]
+        ] = OrderedDict()
+        
+        # dht_key -> announce period (wall clock) it was last announced in.
+        # Exact and small (one entry per shared file), so a plain dict
+        # rather than a bloom filter; saved in node_info across restarts
+        self._announced: Dict[bytes, int] = {}
+        
         # Wire up discovery to DHT
         self.discovery.on_peer_change(self._on_peer_discovered)
     
@@ -131,6 +185,22 @@ class P2PNode:
         
         logger.info(f"Starting P2P node {self.node_id_hex[:16]}...")
         
+        # Worker threads for to_thread (chunk hashing, whole-file hashes);
+        # hashlib releases the GIL, so these use every core. The executor
+        # stays the loop's default after stop (asyncio shuts it down with
+        # the loop); one from an earlier start is shut down once replaced
+        previous = self._executor
+        self._executor = ThreadPoolExecutor(
+            max_workers=min(32, (os.cpu_count() or 1) * 2)
+        )
+        asyncio.get_running_loop().set_default_executor(self._executor)
+        if previous is not None:
+            previous.shutdown(wait=False)
+        
+        # Open the metadata database
+        self.db = await init_database(self.data_dir)
+        await self._load_announced()
+        
         # Start DHT
         await self.dht.start(self.config.host)
         
@@ -163,10 +233,60 @@ class P2PNode:
         
         await self.discovery.stop()
         await self.uploader.stop()
+        await self.downloader.chunk_downloader.close_all()
+        await self._save_routing_table()
+        await self._save_announced()
         await self.dht.stop()
         
+        if self.db:
+            await self.db.close()
+            self.db = None
+        
         logger.info("P2P node stopped")
     
+    async def _save_routing_table(self):
+        """
+        Snapshot the routing table into the known_peers table.
+        
+        Written once at shutdown, in one transaction, rather than on every
+        contact. The transfer port of a DHT contact isn't known, so it is
+        stored as 0.
+        """
+        if not self.db:
+            return
+        try:
+            await self.db.add_peers(
+                (id_to_hex(node.node_id), node.ip, node.port, 0)
+                for node in self.dht.routing_table.iter_nodes()
+            )
+            await self.db.remove_stale_peers()
+        except Exception as e:
+            logger.warning(f"Could not save routing table: {e}")
+    
+    async def _load_announced(self):
+        """Restore this period's announcements saved at the last shutdown."""
+        try:
+            saved = json.loads(await self.db.get_node_info('announced') or '{}')
+        except (ValueError, TypeError):
+            return
+        period = int(time.time() // ANNOUNCE_PERIOD)
+        self._announced = {
+            bytes.fromhex(key): p for key, p in saved.items() if p == period
+        }
+    
+    async def _save_announced(self):
+        """Save this period's announcements to node_info."""
+        if not self.db:
+            return
+        period = int(time.time() // ANNOUNCE_PERIOD)
+        current = {
+            key.hex(): p for key, p in self._announced.items() if p == period
+        }
+        try:
+            await self.db.set_node_info('announced', json.dumps(current))
+        except Exception as e:
+            logger.warning(f"Could not save announcements: {e}")
+    
     async def _bootstrap(self):
         """Bootstrap into the P2P network."""
         bootstrap_nodes = []
@@ -175,6 +295,17 @@ class P2PNode:
         if self.config.bootstrap_nodes:
             bootstrap_nodes.extend(self.config.bootstrap_nodes)
         
+        # Returning node: try the peers saved at the last shutdown first.
+        # If any of them is still up we're in, without the LAN discovery wait
+        saved = [
+            (peer['ip'], peer['dht_port'])
+            for peer in await self.db.get_peers(limit=SEED_PEER_LIMIT)
+        ]
+        if saved:
+            logger.info(f"Rejoining via {len(saved)} saved peers...")
+            if await self.dht.bootstrap(bootstrap_nodes + saved):
+                return
+        
         # Wait for discovery
         if self.config.auto_discover:
             logger.info("Discovering peers on LAN...")
@@ -188,13 +319,56 @@ class P2PNode:
         else:
             logger.info("No bootstrap nodes found, running as first node")
     
+    async def auto_tune_transfer(self, bandwidth_bps: float) -> int:
+        """
+        Size chunks to the bandwidth-delay product (BDP) of the network.
+        
+        Measures the RTT to the first bootstrap node with a DHT ping and
+        sets chunk_size = max(CHUNK_SIZE, bandwidth * RTT), so each chunk
+        request keeps the link busy for at least one round trip.
+        
+        Args:
+            bandwidth_bps: Expected link bandwidth in bits per second
+        
+        Returns:
+            The chunk size now in use
+        """
+        candidates = list(self.config.bootstrap_nodes or [])
+        if self.config.auto_discover:
+            candidates.extend(self.discovery.get_bootstrap_nodes())
+        
+        if not candidates:
+            logger.info("Auto-tune: no bootstrap nodes to measure, "
+                        f"keeping chunk size {self.config.chunk_size:,}")
+            return self.config.chunk_size
+        
+        ip, port = candidates[0]
+        started = time.monotonic()
+        if not await self.dht.ping(ip, port):
+            logger.warning(f"Auto-tune: {ip}:{port} did not respond, "
+                           f"keeping chunk size {self.config.chunk_size:,}")
+            return self.config.chunk_size
+        rtt = time.monotonic() - started
+        
+        bdp_bytes = int(bandwidth_bps / 8 * rtt)
+        self.config.chunk_size = min(max(CHUNK_SIZE, bdp_bytes), MAX_CHUNK_SIZE)
+        
+        logger.info(f"Auto-tune: RTT {rtt * 1000:.1f} ms, BDP {bdp_bytes:,} bytes, "
+                    f"chunk size {self.config.chunk_size:,}")
+        return self.config.chunk_size
+    
     def _on_peer_discovered(self, peer: DiscoveredPeer, is_added: bool):
         """Handle peer discovery events."""
         if is_added and self._running:
-            # Add to DHT routing table
-            asyncio.create_task(
-                self.dht.ping(peer.ip, peer.dht_port)
-            )
+            # Add to DHT routing table (verified by a background ping)
+            try:
+                node_id = bytes.fromhex(peer.node_id)
+            except ValueError:
+                return
+            if self.dht.add_contact(node_id, peer.ip, peer.dht_port) and self.db:
+                # Remember it for the next start (written in batches)
+                self.db.add_peer(peer.node_id, peer.ip, peer.dht_port,
+                                 peer.transfer_port)
     
     # === File Operations ===
     
@@ -220,30 +394,103 @@ class P2PNode:
         
         logger.info(f"Sharing file: {file_path.name}")
         
-        # Create manifest and store chunks
-        manifest = await self.storage.store_file(file_path)
+        # Create the complete manifest first, then store it with the chunks.
+        # It isn't changed afterwards, so it is serialized only once (the
+        # same bytes go to disk and to the DHT)
+        manifest = await create_manifest(
+            file_path, node_id=self.node_id_hex,
+            chunk_size=self.config.chunk_size
+        )
         manifest.description = description
-        manifest.created_by = self.node_id_hex
-        
-        # Store updated manifest
-        await self.storage.store_manifest(manifest)
+        await self.storage.store_file(file_path, manifest=manifest)
         
-        # Announce to DHT (convert 32-byte SHA-256 to 20-byte DHT key)
+        # Announce to DHT (convert 32-byte SHA-256 to 20-byte DHT key), and
+        # store the manifest there for discovery. Run together, they share
+        # one lookup of the key's closest nodes (see KademliaNode.find_node).
+        # Re-sharing a file already announced this period skips both
         dht_key = info_hash_to_dht_key(manifest.info_hash)
-        await self.dht.announce_peer(
-            dht_key, 
-            self.config.transfer_port
-        )
-        
-        # Also store manifest in DHT for discovery
-        await self.dht.store(dht_key, manifest.to_json())
+        period = int(time.time() // ANNOUNCE_PERIOD)
+        if self._announced.get(dht_key) == period:
+            logger.debug(f"{manifest.name} already announced this period")
+        else:
+            announced, _ = await asyncio.gather(
+                self.dht.announce_peer(dht_key, self.config.transfer_port),
+                self.dht.store(dht_key, manifest.to_bytes()),
+            )
+            if announced:
+                self._announced[dht_key] = period
         
         logger.info(f"Shared {manifest.name} with info_hash: {manifest.info_hash[:16]}...")
         
         return manifest
     
+    async def _lookup(self, dht_key: bytes,
+                      bypass_cache: bool = False
+                      ) -> Tuple[Optional[Union[str, bytes]], list]:
+        """
+        Find a file's manifest and peers in the DHT.
+        
+        Results with peers are cached for config.dht_cache_ttl seconds, so
+        repeated downloads of a hot file skip the Kademlia round trips.
+        Empty results are not cached: the file may be announced any moment.
+        """
+        cache = self._lookup_cache
+        if not bypass_cache:
+            entry = cache.get(dht_key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    cache.move_to_end(dht_key)
+                    return entry[1], entry[2]
+                del cache[dht_key]
+        
+        manifest_json = await self.dht.find_value(dht_key)
+        peers = await self.dht.get_peers(dht_key)
+        
+        if peers:
+            expires_at = time.monotonic() + self.config.dht_cache_ttl
+            cache[dht_key] = (expires_at, manifest_json, peers)
+            cache.move_to_end(dht_key)
+            while len(cache) > LOOKUP_CACHE_SIZE:
+                cache.popitem(last=False)
+        
+        return manifest_json, peers
+    
+    async def _fetch_manifest(self, peers: List[Tuple[str, int]],
+                              info_hash: str) -> Optional[FileManifest]:
+        """
+        Get a file's manifest from whichever peer answers first.
+        
+        Asks MANIFEST_FETCH_FANOUT peers at once, each attempt limited to
+        MANIFEST_FETCH_TIMEOUT, and only moves on to the next group if
+        none of them has it. Dead peers then cost one timeout per group
+        instead of one connect timeout each.
+        """
+        fetch = self.downloader.chunk_downloader.download_manifest
+        
+        for start in range(0, len(peers), MANIFEST_FETCH_FANOUT):
+            tasks = {
+                asyncio.create_task(asyncio.wait_for(
+                    fetch(ip, port, info_hash), MANIFEST_FETCH_TIMEOUT
+                ))
+                for ip, port in peers[start:start + MANIFEST_FETCH_FANOUT]
+            }
+            try:
+                while tasks:
+                    done, tasks = await asyncio.wait(
+                        tasks, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        if task.exception() is None and task.result():
+                            return task.result()
+            finally:
+                for task in tasks:
+                    task.cancel()
+        
+        return None
+    
     async def download(self, info_hash: str, output_path: Path = None,
-                      progress_callback: Callable = None) -> Optional[Path]:
+                      progress_callback: Callable = None,
+                      bypass_cache: bool = False) -> Optional[Path]:
         """
         Download a file from the network.
         
@@ -251,6 +498,7 @@ class P2PNode:
             info_hash: SHA-256 hash of the file
             output_path: Where to save the file (default: data_dir/files/)
             progress_callback: Optional callback for progress updates
+            bypass_cache: Query the DHT even if a recent lookup is cached
         
         Returns:
             Path to downloaded file, or None if failed
@@ -260,8 +508,8 @@ class P2PNode:
         # Convert info_hash to DHT key (20 bytes)
         dht_key = info_hash_to_dht_key(info_hash)
         
-        # First try to get manifest from DHT
-        manifest_json = await self.dht.find_value(dht_key)
+        # Get the manifest (if stored in the DHT) and the peers with the file
+        manifest_json, peers = await self._lookup(dht_key, bypass_cache)
         
         manifest = None
         if manifest_json:
@@ -271,31 +519,29 @@ class P2PNode:
             except Exception:
                 pass
         
-        # Find peers who have this file
-        peers = await self.dht.get_peers(dht_key)
-        
         if not peers:
             logger.error("No peers found for this file")
             return None
         
         logger.info(f"Found {len(peers)} peers with the file")
         
+        # Fastest peers first (from earlier transfers), for both the
+        # manifest and the chunks
+        peers = self.downloader.chunk_downloader.rank_peers(peers)
+        
         # If we don't have manifest, try to get from peers
         if manifest is None:
-            for ip, port in peers:
-                manifest = await self.downloader.chunk_downloader.download_manifest(
-                    ip, port, info_hash
-                )
-                if manifest:
-                    break
+            manifest = await self._fetch_manifest(peers, info_hash)
         
         if manifest is None:
             logger.error("Could not get file manifest")
+            # The cached peers may be gone; look them up again next time
+            self._lookup_cache.pop(dht_key, None)
             return None
         
         # Peers from get_peers already have the transfer port
         # (announce_peer stores the transfer port, not DHT port)
-        transfer_peers = list(peers)
+        transfer_peers = peers
         
         # Download the file
         result = await self.downloader.download_file(
@@ -305,6 +551,9 @@ class P2PNode:
             output_path=output_path
         )
         
+        if result is None:
+            self._lookup_cache.pop(dht_key, None)
+        
         return result
     
     async def list_shared_files(self) -> List[FileManifest]:
@@ -317,6 +566,9 @@ class P2PNode:
     
     async def remove_shared_file(self, info_hash: str) -> bool:
         """Stop sharing a file."""
+        # Sharing it again should announce it again
+        self._announced.pop(info_hash_to_dht_key(info_hash), None)
+        
         # Remove manifest
         return await self.storage.delete_manifest(info_hash)
     
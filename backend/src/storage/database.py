@@ -22,20 +22,48 @@ Tables:
 - known_peers: Persistent peer list
 - shared_files: Files we're sharing
 - download_progress: Partial downloads
+
+Hashes (info hashes, chunk hashes) are stored as 32-byte BLOBs rather
+than 64-character hex TEXT: half the row and index size, and no text
+comparisons. The methods below still take and return hex strings, so the
+conversion happens only here. Databases from before this (schema version
+1) are migrated once on connect.
 """
 
 import asyncio
 import logging
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Tuple
 from datetime import datetime
 
 import aiosqlite
 
 logger = logging.getLogger(__name__)
 
-# Schema version for migrations
-SCHEMA_VERSION = 1
+# Schema version for migrations (kept in PRAGMA user_version)
+# 2: info_hash / chunk_hash stored as 32-byte BLOBs instead of hex TEXT
+SCHEMA_VERSION = 2
+
+# Connection tuning, applied on connect
+_PRAGMAS = (
+    # WAL: commits append to the log instead of rewriting the database
+    # through a rollback journal, readers don't block the writer, and
+    # NORMAL only syncs at checkpoints, which is still crash-safe in WAL
+    # mode (a power loss can only drop the latest commits)
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA wal_autocheckpoint = 1000",  # pages
+    # Temp tables/indices in memory, reads through a 256MB memory map
+    # and a 64MB page cache (negative = KiB)
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -65536",
+)
+
+# add_peer writes are queued and flushed together once this many are
+# waiting, or this long (seconds) after the first one
+PEER_FLUSH_SIZE = 32
+PEER_FLUSH_DELAY = 0.1
 
 
 class Database:
@@ -52,29 +80,54 @@ class Database:
     def __init__(self, db_path: Path):
         self.db_path = Path(db_path)
         self._connection: Optional[aiosqlite.Connection] = None
+        
+        # Queued add_peer rows (None tells the flusher to stop)
+        self._peer_queue: Optional[asyncio.Queue] = None
+        self._peer_flusher: Optional[asyncio.Task] = None
     
     async def connect(self):
         """Open database connection."""
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self._connection = await aiosqlite.connect(self.db_path)
+        # sqlite3 reuses prepared statements keyed by SQL text; room for
+        # every statement in this class so none is ever re-prepared
+        self._connection = await aiosqlite.connect(self.db_path, cached_statements=256)
         self._connection.row_factory = aiosqlite.Row
         
         # Enable foreign keys
         await self._connection.execute("PRAGMA foreign_keys = ON")
         
+        for pragma in _PRAGMAS:
+            await self._connection.execute(pragma)
+        
         # Initialize schema
         await self._init_schema()
         
+        self._peer_queue = asyncio.Queue()
+        self._peer_flusher = asyncio.create_task(self._flush_peers())
+        
         logger.info(f"Database connected: {self.db_path}")
     
     async def close(self):
         """Close database connection."""
+        if self._peer_flusher:
+            # Let the flusher write what's still queued, then stop
+            self._peer_queue.put_nowait(None)
+            await self._peer_flusher
+            self._peer_flusher = None
+        
         if self._connection:
             await self._connection.close()
             self._connection = None
     
     async def _init_schema(self):
         """Initialize database schema."""
+        async with self._connection.execute("PRAGMA user_version") as cursor:
+            version = (await cursor.fetchone())[0]
+        
+        # Version 1 never recorded itself; its tables exist with version 0
+        if version < 2 and await self._table_exists('downloads'):
+            await self._migrate_hashes_to_blob()
+        
         await self._connection.executescript("""
             -- Node information
             CREATE TABLE IF NOT EXISTS node_info (
@@ -96,7 +149,7 @@ class Database:
             
             -- Shared files metadata
             CREATE TABLE IF NOT EXISTS shared_files (
-                info_hash TEXT PRIMARY KEY,
+                info_hash BLOB PRIMARY KEY CHECK(length(info_hash) = 32),
                 name TEXT NOT NULL,
                 size INTEGER NOT NULL,
                 chunk_count INTEGER NOT NULL,
@@ -107,7 +160,7 @@ class Database:
             
             -- Download progress tracking
             CREATE TABLE IF NOT EXISTS downloads (
-                info_hash TEXT PRIMARY KEY,
+                info_hash BLOB PRIMARY KEY CHECK(length(info_hash) = 32),
                 name TEXT NOT NULL,
                 size INTEGER NOT NULL,
                 total_chunks INTEGER NOT NULL,
@@ -119,9 +172,9 @@ class Database:
             
             -- Downloaded chunks tracking
             CREATE TABLE IF NOT EXISTS downloaded_chunks (
-                info_hash TEXT NOT NULL,
+                info_hash BLOB NOT NULL,
                 chunk_index INTEGER NOT NULL,
-                chunk_hash TEXT NOT NULL,
+                chunk_hash BLOB NOT NULL CHECK(length(chunk_hash) = 32),
                 downloaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 PRIMARY KEY (info_hash, chunk_index),
                 FOREIGN KEY (info_hash) REFERENCES downloads(info_hash) ON DELETE CASCADE
@@ -132,8 +185,89 @@ class Database:
             CREATE INDEX IF NOT EXISTS idx_downloads_status ON downloads(status);
         """)
         
+        await self._connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         await self._connection.commit()
     
+    async def _table_exists(self, name: str) -> bool:
+        async with self._connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (name,)
+        ) as cursor:
+            return await cursor.fetchone() is not None
+    
+    async def _migrate_hashes_to_blob(self):
+        """
+        Schema 1 -> 2: rebuild the hash-keyed tables with BLOB hashes.
+        
+        SQLite can't change a column's type in place, so each table is
+        copied into a new one (hex-decoding on the way) which then
+        replaces it. Rows whose hashes aren't valid hex are dropped.
+        """
+        logger.info("Migrating database hashes to BLOB columns")
+        await self._connection.create_function(
+            'unhex', 1, bytes.fromhex, deterministic=True
+        )
+        valid = "length({0}) = 64 AND {0} NOT GLOB '*[^0-9a-fA-F]*'"
+        # Foreign keys can only be toggled outside a transaction
+        await self._connection.executescript(f"""
+            PRAGMA foreign_keys = OFF;
+            BEGIN;
+            
+            CREATE TABLE new_shared_files (
+                info_hash BLOB PRIMARY KEY CHECK(length(info_hash) = 32),
+                name TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                chunk_count INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                description TEXT,
+                local_path TEXT
+            );
+            INSERT INTO new_shared_files
+                SELECT unhex(info_hash), name, size, chunk_count, created_at,
+                       description, local_path
+                FROM shared_files WHERE {valid.format('info_hash')};
+            DROP TABLE shared_files;
+            ALTER TABLE new_shared_files RENAME TO shared_files;
+            
+            CREATE TABLE new_downloads (
+                info_hash BLOB PRIMARY KEY CHECK(length(info_hash) = 32),
+                name TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                total_chunks INTEGER NOT NULL,
+                downloaded_chunks INTEGER DEFAULT 0,
+                started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                completed_at TIMESTAMP,
+                status TEXT DEFAULT 'in_progress'
+            );
+            INSERT INTO new_downloads
+                SELECT unhex(info_hash), name, size, total_chunks,
+                       downloaded_chunks, started_at, completed_at, status
+                FROM downloads WHERE {valid.format('info_hash')};
+            
+            CREATE TABLE new_downloaded_chunks (
+                info_hash BLOB NOT NULL,
+                chunk_index INTEGER NOT NULL,
+                chunk_hash BLOB NOT NULL CHECK(length(chunk_hash) = 32),
+                downloaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (info_hash, chunk_index),
+                FOREIGN KEY (info_hash) REFERENCES downloads(info_hash) ON DELETE CASCADE
+            );
+            INSERT INTO new_downloaded_chunks
+                SELECT unhex(info_hash), chunk_index, unhex(chunk_hash),
+                       downloaded_at
+                FROM downloaded_chunks
+                WHERE {valid.format('info_hash')} AND {valid.format('chunk_hash')};
+            
+            DROP TABLE downloaded_chunks;
+            DROP TABLE downloads;
+            ALTER TABLE new_downloads RENAME TO downloads;
+            ALTER TABLE new_downloaded_chunks RENAME TO downloaded_chunks;
+            
+            PRAGMA user_version = 2;
+            COMMIT;
+            PRAGMA foreign_keys = ON;
+        """)
+    
     # === Node Info ===
     
     async def get_node_info(self, key: str) -> Optional[str]:
@@ -156,25 +290,75 @@ class Database:
     
     # === Peers ===
     
-    async def add_peer(self, node_id: str, ip: str, dht_port: int, 
-                      transfer_port: int):
-        """Add or update a known peer."""
-        await self._connection.execute(
+    def add_peer(self, node_id: str, ip: str, dht_port: int, 
+                 transfer_port: int):
+        """
+        Add or update a known peer.
+        
+        The write is only queued, so this isn't a coroutine: LAN discovery
+        calls it from its (synchronous) peer callbacks, and a discovery
+        burst would otherwise commit (and sync) once per peer. Queued peers
+        are written in one transaction (see _flush_peers), at the latest
+        on close().
+        """
+        self._peer_queue.put_nowait((node_id, ip, dht_port, transfer_port))
+    
+    async def _flush_peers(self):
+        """Background task writing queued add_peer rows in batches."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            peer = await self._peer_queue.get()
+            if peer is None:
+                break
+            
+            batch = [peer]
+            deadline = loop.time() + PEER_FLUSH_DELAY
+            while len(batch) < PEER_FLUSH_SIZE:
+                try:
+                    peer = await asyncio.wait_for(
+                        self._peer_queue.get(), deadline - loop.time()
+                    )
+                except asyncio.TimeoutError:
+                    break
+                if peer is None:
+                    stopping = True
+                    break
+                batch.append(peer)
+            
+            try:
+                await self.add_peers(batch)
+            except Exception as e:
+                logger.warning(f"Could not save {len(batch)} peers: {e}")
+    
+    async def add_peers(self, peers: Iterable[Tuple[str, str, int, int]]):
+        """
+        Add or update many known peers in one transaction.
+        
+        Args:
+            peers: (node_id, ip, dht_port, transfer_port) tuples; a
+                transfer_port of 0 (unknown) keeps the one stored
+        """
+        await self._connection.executemany(
             """INSERT INTO known_peers (node_id, ip, dht_port, transfer_port, last_seen)
                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
                ON CONFLICT(node_id) DO UPDATE SET 
-                   ip = ?, dht_port = ?, transfer_port = ?, last_seen = CURRENT_TIMESTAMP""",
-            (node_id, ip, dht_port, transfer_port, ip, dht_port, transfer_port)
+                   ip = excluded.ip, dht_port = excluded.dht_port,
+                   transfer_port = CASE WHEN excluded.transfer_port = 0
+                       THEN known_peers.transfer_port
+                       ELSE excluded.transfer_port END,
+                   last_seen = CURRENT_TIMESTAMP""",
+            peers
         )
         await self._connection.commit()
     
     async def get_peers(self, limit: int = 50) -> List[Dict]:
-        """Get known peers, ordered by most recently seen."""
+        """Get known peers, most recently seen (then most reliable) first."""
         async with self._connection.execute(
             """SELECT node_id, ip, dht_port, transfer_port, last_seen,
                       successful_connections, failed_connections
                FROM known_peers
-               ORDER BY last_seen DESC
+               ORDER BY last_seen DESC, successful_connections DESC
                LIMIT ?""",
             (limit,)
         ) as cursor:
@@ -221,8 +405,8 @@ class Database:
                VALUES (?, ?, ?, ?, ?, ?)
                ON CONFLICT(info_hash) DO UPDATE SET 
                    name = ?, size = ?, chunk_count = ?, description = ?, local_path = ?""",
-            (info_hash, name, size, chunk_count, description, local_path,
-             name, size, chunk_count, description, local_path)
+            (bytes.fromhex(info_hash), name, size, chunk_count, description,
+             local_path, name, size, chunk_count, description, local_path)
         )
         await self._connection.commit()
     
@@ -232,13 +416,13 @@ class Database:
             "SELECT * FROM shared_files ORDER BY created_at DESC"
         ) as cursor:
             rows = await cursor.fetchall()
-            return [dict(row) for row in rows]
+            return [_row_to_dict(row) for row in rows]
     
     async def remove_shared_file(self, info_hash: str):
         """Remove a shared file record."""
         await self._connection.execute(
             "DELETE FROM shared_files WHERE info_hash = ?",
-            (info_hash,)
+            (bytes.fromhex(info_hash),)
         )
         await self._connection.commit()
     
@@ -251,27 +435,45 @@ class Database:
             """INSERT INTO downloads (info_hash, name, size, total_chunks)
                VALUES (?, ?, ?, ?)
                ON CONFLICT(info_hash) DO UPDATE SET status = 'in_progress'""",
-            (info_hash, name, size, total_chunks)
+            (bytes.fromhex(info_hash), name, size, total_chunks)
         )
         await self._connection.commit()
     
     async def mark_chunk_downloaded(self, info_hash: str, chunk_index: int,
                                    chunk_hash: str):
         """Mark a chunk as downloaded."""
-        await self._connection.execute(
+        await self.mark_chunks_downloaded(info_hash, [(chunk_index, chunk_hash)])
+    
+    async def mark_chunks_downloaded(self, info_hash: str,
+                                    chunks: Iterable[Tuple[int, str]]):
+        """
+        Mark several chunks as downloaded in one transaction.
+        
+        Prefer this over per-chunk calls while downloading: every commit
+        is a disk sync, so batching chunk records (e.g. every few dozen
+        chunks) keeps metadata I/O far below the network transfer.
+        
+        Args:
+            info_hash: The download the chunks belong to
+            chunks: (chunk_index, chunk_hash) pairs
+        """
+        key = bytes.fromhex(info_hash)
+        cursor = await self._connection.executemany(
             """INSERT INTO downloaded_chunks (info_hash, chunk_index, chunk_hash)
                VALUES (?, ?, ?)
                ON CONFLICT DO NOTHING""",
-            (info_hash, chunk_index, chunk_hash)
+            [(key, index, bytes.fromhex(chunk_hash)) for index, chunk_hash in chunks]
         )
         
-        # Update chunk count
-        await self._connection.execute(
-            """UPDATE downloads SET downloaded_chunks = 
-               (SELECT COUNT(*) FROM downloaded_chunks WHERE info_hash = ?)
-               WHERE info_hash = ?""",
-            (info_hash, info_hash)
-        )
+        # Count only the rows actually inserted (repeats are ignored above),
+        # instead of recounting every chunk of the download
+        added = cursor.rowcount
+        if added > 0:
+            await self._connection.execute(
+                """UPDATE downloads SET downloaded_chunks = downloaded_chunks + ?
+                   WHERE info_hash = ?""",
+                (added, key)
+            )
         await self._connection.commit()
     
     async def complete_download(self, info_hash: str):
@@ -280,7 +482,7 @@ class Database:
             """UPDATE downloads 
                SET status = 'completed', completed_at = CURRENT_TIMESTAMP
                WHERE info_hash = ?""",
-            (info_hash,)
+            (bytes.fromhex(info_hash),)
         )
         await self._connection.commit()
     
@@ -288,16 +490,16 @@ class Database:
         """Get download progress."""
         async with self._connection.execute(
             "SELECT * FROM downloads WHERE info_hash = ?",
-            (info_hash,)
+            (bytes.fromhex(info_hash),)
         ) as cursor:
             row = await cursor.fetchone()
-            return dict(row) if row else None
+            return _row_to_dict(row) if row else None
     
     async def get_downloaded_chunks(self, info_hash: str) -> List[int]:
         """Get list of downloaded chunk indices."""
         async with self._connection.execute(
             "SELECT chunk_index FROM downloaded_chunks WHERE info_hash = ?",
-            (info_hash,)
+            (bytes.fromhex(info_hash),)
         ) as cursor:
             rows = await cursor.fetchall()
             return [row['chunk_index'] for row in rows]
@@ -308,7 +510,14 @@ class Database:
             "SELECT * FROM downloads WHERE status = 'in_progress'"
         ) as cursor:
             rows = await cursor.fetchall()
-            return [dict(row) for row in rows]
+            return [_row_to_dict(row) for row in rows]
+
+
+def _row_to_dict(row: aiosqlite.Row) -> Dict:
+    """Row as a dict, with the BLOB info_hash back in hex."""
+    result = dict(row)
+    result['info_hash'] = result['info_hash'].hex()
+    return result
 
 
 async def init_database(data_dir: Path) -> Database:
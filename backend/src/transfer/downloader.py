@@ -25,8 +25,9 @@ Options Considered:
 Decision: Parallel multi-peer download
 - Request different chunks from different peers
 - Retry failed chunks with other peers
-- Simple round-robin peer selection initially
-- Can add rarest-first later
+- Rarest-first chunk order (peers report bitfields)
+- Work stealing: each peer's workers pull the next chunk from a shared
+  queue, so fast peers take more chunks instead of waiting on slow ones
 
 Download Flow:
 1. Get manifest (from DHT or peers)
@@ -38,8 +39,12 @@ Download Flow:
 
 import asyncio
 import logging
+import sys
+from collections import deque, OrderedDict
 import time
 import hashlib
+import statistics
+import weakref
 from typing import Optional, List, Tuple, Dict, Set, Callable
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -47,9 +52,21 @@ from pathlib import Path
 from .protocol import connect_to_peer, TransferProtocol
 from ..file.storage import ChunkStorage
 from ..file.manifest import FileManifest
+from ..file.chunker import digest_matches
 
 logger = logging.getLogger(__name__)
 
+# Python 3.12+ can start a task eagerly: it runs up to its first real
+# suspension right away instead of waiting a loop turn to begin
+EAGER_TASKS = sys.version_info >= (3, 12)
+
+
+def _start_task(coro) -> asyncio.Task:
+    """Start a task, eagerly where supported."""
+    if EAGER_TASKS:
+        return asyncio.Task(coro, loop=asyncio.get_running_loop(), eager_start=True)
+    return asyncio.create_task(coro)
+
 
 @dataclass
 class DownloadProgress:
@@ -84,17 +101,248 @@ class DownloadProgress:
         if elapsed == 0:
             return 0
         return self.bytes_downloaded / elapsed
+    
+    def to_dict(self) -> dict:
+        """Serialize for progress reporting (e.g. the API's event stream)."""
+        return {
+            'total_chunks': self.total_chunks,
+            'downloaded_chunks': self.downloaded_chunks,
+            'failed_chunks': self.failed_chunks,
+            'bytes_downloaded': self.bytes_downloaded,
+            'progress_percent': self.progress_percent,
+            'speed_bytes_per_sec': self.speed_bytes_per_sec,
+            'elapsed_seconds': self.elapsed_seconds,
+        }
 
 
 # Progress callback type
 ProgressCallback = Callable[[DownloadProgress], None]
 
+# Least time (seconds) between progress callbacks; counters are always
+# current, and the last chunk of a download is always reported
+PROGRESS_INTERVAL = 0.1
+
+# Fewest completed chunks between concurrency adjustments (the window is
+# also at least two rounds of the current limit)
+TUNE_INTERVAL_CHUNKS = 8
+
+# How long (seconds) a peer gets to answer a bitfield request
+BITFIELD_TIMEOUT = 2.0
+
+# Per-peer chunk timeout: this many times the peer's usual chunk request
+# time, plus slack (capped by ChunkDownloader.chunk_timeout)
+PEER_TIMEOUT_FACTOR = 4.0
+PEER_TIMEOUT_SLACK = 0.5
+
+# A peer's download workers stop after this many failed chunks in a row
+PEER_MAX_FAILURES = 3
+
+# Pooled connections: checked (and re-established if broken) this often,
+# given this long to answer the check, and closed after this long unused
+# (all in seconds)
+KEEPALIVE_INTERVAL = 15.0
+KEEPALIVE_TIMEOUT = 2.0
+KEEPALIVE_IDLE_LIMIT = 120.0
+
+
+@dataclass
+class PeerStats:
+    """Observed chunk transfers with one peer."""
+    rtt: Optional[float] = None  # EWMA of chunk request time (seconds)
+    successes: int = 0
+    failures: int = 0
+    
+    def record(self, seconds: Optional[float], success: bool):
+        """Fold in one chunk request (seconds is None if not timed)."""
+        if seconds is not None:
+            self.rtt = seconds if self.rtt is None else 0.8 * self.rtt + 0.2 * seconds
+        if success:
+            self.successes += 1
+        else:
+            self.failures += 1
+
+
+class _ChunkQueue:
+    """
+    The missing chunks of one download, shared by all peer workers.
+    
+    A worker takes the first queued chunk its peer holds and hasn't
+    failed; a failed chunk goes to the back for the other holders. A
+    chunk is given up once every holder still working has failed it.
+    """
+    
+    def __init__(self, chunks: List[str],
+                 holders: Dict[str, List[Tuple[str, int]]],
+                 peers: List[Tuple[str, int]]):
+        self._queue = deque(chunks)
+        self._holders = holders
+        self._peers = peers
+        self._tried: Dict[str, Set[Tuple[str, int]]] = {}
+        self._retired: Set[Tuple[str, int]] = set()
+        self._in_flight = 0
+        self._changed = asyncio.Condition()
+        self._closed = False
+        self.failed = 0
+    
+    def _can_take(self, peer: Tuple[str, int], chunk_hash: str) -> bool:
+        return (peer not in self._retired
+                and peer in self._holders.get(chunk_hash, self._peers)
+                and peer not in self._tried.get(chunk_hash, ()))
+    
+    async def take(self, peer: Tuple[str, int]) -> Optional[str]:
+        """Next chunk for a peer, waiting while others may fail theirs."""
+        async with self._changed:
+            while not self._closed:
+                for i, chunk_hash in enumerate(self._queue):
+                    if self._can_take(peer, chunk_hash):
+                        del self._queue[i]
+                        self._in_flight += 1
+                        return chunk_hash
+                if not self._queue and not self._in_flight:
+                    return None
+                await self._changed.wait()
+            return None
+    
+    async def close(self):
+        """End the download: every take() returns None from now on."""
+        async with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+    
+    async def retry(self, chunk_hash: str):
+        """Put a taken chunk back at the front, held against nobody."""
+        async with self._changed:
+            self._in_flight -= 1
+            self._queue.appendleft(chunk_hash)
+            self._changed.notify_all()
+    
+    async def done(self, peer: Tuple[str, int], chunk_hash: str, ok: bool):
+        """Report a taken chunk as downloaded (ok) or failed by peer."""
+        async with self._changed:
+            self._in_flight -= 1
+            if not ok:
+                self._tried.setdefault(chunk_hash, set()).add(peer)
+                self._queue.append(chunk_hash)
+                self._prune()
+            self._changed.notify_all()
+    
+    async def retire(self, peer: Tuple[str, int]):
+        """A peer's workers have stopped; don't wait on it for anything."""
+        async with self._changed:
+            self._retired.add(peer)
+            self._prune()
+            self._changed.notify_all()
+    
+    def _prune(self):
+        """Give up queued chunks that no working holder can still try."""
+        keep = deque()
+        for chunk_hash in self._queue:
+            tried = self._tried.get(chunk_hash, ())
+            if any(p not in self._retired and p not in tried
+                   for p in self._holders.get(chunk_hash, self._peers)):
+                keep.append(chunk_hash)
+            else:
+                self.failed += 1
+        self._queue = keep
+
+
+class ConcurrencyLimiter:
+    """
+    Async context manager limiting concurrent chunk downloads, with the
+    limit tuned from measured throughput.
+    
+    Hill climbing: after each window of completed chunks, the window's
+    throughput is folded into an EWMA. If that beats the previous EWMA by
+    5% the limit keeps moving the same way, otherwise it turns around, so
+    it settles around the point where extra parallelism stops paying.
+    Timeouts during the window back off by two, since they mean a peer or
+    the link is already overloaded.
+    """
+    
+    def __init__(self, initial: int, minimum: int, maximum: int,
+                 timeout_count: Callable[[], int] = lambda: 0):
+        """
+        Args:
+            initial: Starting limit
+            minimum: Lowest the limit is tuned down to
+            maximum: Highest the limit is tuned up to
+            timeout_count: Returns the running count of chunk timeouts
+        """
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(max(initial, self.minimum), self.maximum)
+        
+        self._active = 0
+        self._cond = asyncio.Condition()
+        self._timeout_count = timeout_count
+        
+        # Current measurement window
+        self._window_start = time.monotonic()
+        self._window_chunks = 0
+        self._window_bytes = 0
+        self._window_timeouts = timeout_count()
+        self._throughput: Optional[float] = None  # EWMA, bytes/sec
+        self._direction = 1  # Next move of the limit (probe upwards first)
+    
+    async def __aenter__(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._active < self.limit)
+            self._active += 1
+    
+    async def __aexit__(self, *exc_info):
+        async with self._cond:
+            self._active -= 1
+            # Wake as many waiters as there are free slots (more than one
+            # if the limit was just raised)
+            self._cond.notify(max(0, self.limit - self._active))
+    
+    def completed(self, nbytes: int):
+        """Record a downloaded chunk; retunes the limit every window."""
+        self._window_chunks += 1
+        self._window_bytes += nbytes
+        if self._window_chunks >= max(TUNE_INTERVAL_CHUNKS, 2 * self.limit):
+            self._tune()
+    
+    def _tune(self):
+        """Adjust the limit from the window that just completed."""
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        rate = self._window_bytes / elapsed if elapsed > 0 else 0.0
+        timeouts = self._timeout_count()
+        
+        previous = self._throughput
+        self._throughput = rate if previous is None else 0.5 * rate + 0.5 * previous
+        
+        if timeouts > self._window_timeouts:
+            self._direction = -1
+            step = -2
+        else:
+            if previous is not None and self._throughput < previous * 1.05:
+                # The last move didn't pay off: head the other way
+                self._direction = -self._direction
+            # Steps scale with the limit so that each one is a similar
+            # relative change (and throughput difference) at any size
+            step = self._direction * max(1, self.limit // 8)
+        self.limit = min(max(self.limit + step, self.minimum), self.maximum)
+        
+        self._window_start = now
+        self._window_chunks = 0
+        self._window_bytes = 0
+        self._window_timeouts = timeouts
+
 
 class ChunkDownloader:
     """
     Downloads individual chunks from peers.
     
     Handles connection management and retry logic.
+    
+    Connections are pooled across downloads, up to max_connections
+    (least recently used idle ones are evicted). A background task pings
+    idle connections every KEEPALIVE_INTERVAL and reconnects broken ones,
+    so the next request usually finds a warm connection instead of
+    paying for a TCP handshake; connections unused for
+    KEEPALIVE_IDLE_LIMIT are closed.
     """
     
     def __init__(self, max_connections: int = 5, 
@@ -102,19 +350,88 @@ class ChunkDownloader:
         self.max_connections = max_connections
         self.chunk_timeout = chunk_timeout
         
-        # Connection pool: (ip, port) -> TransferProtocol
-        self._connections: Dict[Tuple[str, int], TransferProtocol] = {}
+        # Connection pool: (ip, port) -> TransferProtocol, least recently
+        # used first, and when each was last used (monotonic)
+        self._connections: OrderedDict[Tuple[str, int], TransferProtocol] = OrderedDict()
+        self._last_used: Dict[Tuple[str, int], float] = {}
         self._connection_lock = asyncio.Lock()
+        self._keepalive_task: Optional[asyncio.Task] = None
+        
+        # Per-peer connect locks: requests to one peer share a connection,
+        # while connects to different peers (each up to the connect
+        # timeout) don't wait on each other
+        self._connect_locks: Dict[Tuple[str, int], asyncio.Lock] = {}
+        
+        # Chunk requests that timed out (read by the concurrency limiter)
+        self.timeouts = 0
+        
+        # Connections whose loss has already been held against the peer
+        # (or wasn't its fault), so requests failing with them don't count
+        self._lost_connections: "weakref.WeakSet[TransferProtocol]" = weakref.WeakSet()
+        
+        # (ip, port) -> observed transfers (see rank_peers, timeout_for)
+        self.peer_stats: Dict[Tuple[str, int], PeerStats] = {}
+    
+    def _record(self, key: Tuple[str, int], seconds: Optional[float],
+                success: bool):
+        stats = self.peer_stats.get(key)
+        if stats is None:
+            stats = self.peer_stats[key] = PeerStats()
+        stats.record(seconds, success)
+    
+    def _median_rtt(self, peers: List[Tuple[str, int]]) -> Optional[float]:
+        times = [
+            self.peer_stats[p].rtt for p in peers
+            if p in self.peer_stats and self.peer_stats[p].rtt is not None
+        ]
+        return statistics.median(times) if times else None
+    
+    def rank_peers(self, peers: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+        """
+        Order peers fastest first, by their measured chunk request time.
+        
+        Peers we haven't measured yet are ranked as if they were median,
+        so they still get tried before the known slow ones.
+        """
+        median = self._median_rtt(peers)
+        if median is None:
+            return list(peers)
+        
+        def rtt(peer):
+            stats = self.peer_stats.get(peer)
+            return median if stats is None or stats.rtt is None else stats.rtt
+        return sorted(peers, key=rtt)
+    
+    def timeout_for(self, ip: str, port: int) -> float:
+        """
+        Chunk timeout for a peer, from its usual chunk request time.
+        
+        A stalled peer is given up on after a few of its normal request
+        times instead of the full chunk_timeout, so it holds a download
+        slot far less long.
+        """
+        stats = self.peer_stats.get((ip, port))
+        if stats is None or stats.rtt is None:
+            return self.chunk_timeout
+        return min(self.chunk_timeout,
+                   PEER_TIMEOUT_FACTOR * stats.rtt + PEER_TIMEOUT_SLACK)
     
     async def get_connection(self, ip: str, port: int) -> Optional[TransferProtocol]:
         """Get or create a connection to a peer."""
         key = (ip, port)
         
-        async with self._connection_lock:
+        lock = self._connect_locks.get(key)
+        if lock is None:
+            lock = self._connect_locks[key] = asyncio.Lock()
+        
+        async with lock:
+            self._last_used[key] = time.monotonic()
+            
             # Check existing connection
             if key in self._connections:
                 conn = self._connections[key]
                 if not conn._closed:
+                    self._connections.move_to_end(key)
                     return conn
                 else:
                     del self._connections[key]
@@ -123,24 +440,101 @@ class ChunkDownloader:
             conn = await connect_to_peer(ip, port)
             if conn:
                 self._connections[key] = conn
+                await self._evict_idle()
+                if self._keepalive_task is None or self._keepalive_task.done():
+                    self._keepalive_task = asyncio.create_task(self._keepalive())
+        
+        if conn is None:
+            self._forget(key)
+        return conn
+    
+    def _forget(self, key: Tuple[str, int]):
+        """
+        Drop a peer's bookkeeping once it has no pooled connection, so it
+        doesn't pile up over every peer ever contacted. A connect lock is
+        kept while a request holds it.
+        """
+        if key in self._connections:
+            return
+        self._last_used.pop(key, None)
+        lock = self._connect_locks.get(key)
+        if lock is not None and not lock.locked():
+            del self._connect_locks[key]
+    
+    async def _evict_idle(self):
+        """Close least recently used idle connections beyond max_connections."""
+        excess = len(self._connections) - self.max_connections
+        for key in list(self._connections):
+            if excess <= 0:
+                break
+            conn = self._connections[key]
+            if conn.in_flight == 0:
+                del self._connections[key]
+                self._forget(key)
+                await conn.close()
+                excess -= 1
+    
+    async def _keepalive(self):
+        """Background task: keep pooled connections open and working."""
+        while self._connections:
+            await asyncio.sleep(KEEPALIVE_INTERVAL)
+            now = time.monotonic()
             
-            return conn
+            for key, conn in list(self._connections.items()):
+                if conn.in_flight:
+                    continue  # Busy, so evidently working
+                
+                if now - self._last_used.get(key, now) > KEEPALIVE_IDLE_LIMIT:
+                    await self.close_connection(*key)
+                    continue
+                
+                try:
+                    alive = not conn._closed and await asyncio.wait_for(
+                        conn.ping(), KEEPALIVE_TIMEOUT
+                    )
+                except (asyncio.TimeoutError, ConnectionError):
+                    alive = False
+                if alive:
+                    continue
+                
+                # Reconnect now rather than on the next request (keeping
+                # its idle time, so an unused peer still expires)
+                last_used = self._last_used.get(key, now)
+                self._lost_connections.add(conn)
+                await self.close_connection(*key)
+                lock = self._connect_locks.setdefault(key, asyncio.Lock())
+                async with lock:
+                    if key not in self._connections:
+                        fresh = await connect_to_peer(*key)
+                        if fresh:
+                            self._connections[key] = fresh
+                            self._connections.move_to_end(key, last=False)
+                            self._last_used[key] = last_used
+                self._forget(key)
     
     async def close_connection(self, ip: str, port: int):
         """Close a connection to a peer."""
         key = (ip, port)
         
         async with self._connection_lock:
-            if key in self._connections:
-                await self._connections[key].close()
-                del self._connections[key]
+            conn = self._connections.pop(key, None)
+            self._forget(key)
+            if conn is not None:
+                await conn.close()
     
     async def close_all(self):
-        """Close all connections."""
+        """Close all connections (and stop keeping them alive)."""
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
         async with self._connection_lock:
             for conn in self._connections.values():
                 await conn.close()
             self._connections.clear()
+            self._last_used.clear()
+            for key, lock in list(self._connect_locks.items()):
+                if not lock.locked():
+                    del self._connect_locks[key]
     
     async def download_chunk(self, ip: str, port: int, 
                             chunk_hash: str) -> Optional[bytes]:
@@ -149,36 +543,61 @@ class ChunkDownloader:
         
         Returns:
             Chunk data (verified), or None if failed
+        
+        Raises:
+            ConnectionError: The connection was lost under this request
+                and the loss is already counted (by the request that
+                caused or first saw it). Not the peer's failure for this
+                chunk, so worth simply retrying
         """
+        conn = None
         try:
             conn = await self.get_connection(ip, port)
             if conn is None:
                 return None
             
-            # Request chunk with timeout
-            data = await asyncio.wait_for(
-                conn.request_chunk(chunk_hash),
-                timeout=self.chunk_timeout
-            )
+            # Request chunk with timeout, hashing it while it arrives. The
+            # timeout starts once the peer gets to this request, not while
+            # it is still serving earlier ones on the connection
+            hasher = hashlib.sha256()
+            timeout = self.timeout_for(ip, port)
+            started = time.monotonic()
+            data = await conn.request_chunk(chunk_hash, hasher, timeout)
+            elapsed = time.monotonic() - started
             
             if data is None:
+                if conn._closed:
+                    if conn in self._lost_connections:
+                        raise ConnectionError("Connection lost")
+                    self._lost_connections.add(conn)
+                self._record((ip, port), None, success=False)
                 return None
             
-            # Verify hash
-            actual_hash = hashlib.sha256(data).hexdigest()
-            if actual_hash != chunk_hash:
+            # Verify hash (the response was read in full, so the
+            # connection itself is still fine)
+            if not digest_matches(hasher.digest(), chunk_hash):
                 logger.warning(f"Chunk hash mismatch from {ip}:{port}")
-                await self.close_connection(ip, port)
+                self._record((ip, port), None, success=False)
                 return None
             
+            self._record((ip, port), elapsed, success=True)
             return data
             
         except asyncio.TimeoutError:
-            logger.warning(f"Chunk download timeout from {ip}:{port}")
-            await self.close_connection(ip, port)
+            self.timeouts += 1
+            self._record((ip, port), timeout, success=False)
+            logger.warning(f"Chunk download timeout from {ip}:{port} ({timeout:.1f}s)")
+            # The connection stays: the protocol discards the late response
+            # (or closes the connection if it never comes), and requests
+            # queued behind it still get their own turn
             return None
+        except ConnectionError:
+            raise
         except Exception as e:
             logger.error(f"Error downloading chunk from {ip}:{port}: {e}")
+            self._record((ip, port), None, success=False)
+            if conn is not None:
+                self._lost_connections.add(conn)
             await self.close_connection(ip, port)
             return None
     
@@ -212,6 +631,33 @@ class ChunkDownloader:
             return None
 
 
+    async def download_bitfield(self, ip: str, port: int,
+                                info_hash: str) -> Optional[bytes]:
+        """
+        Ask a peer which chunks of a file it has.
+        
+        Nodes from before bitfields existed never answer, so this gives up
+        after BITFIELD_TIMEOUT (dropping the connection, whose request and
+        response would be out of step otherwise).
+        
+        Returns:
+            The peer's bitfield, or None if unknown
+        """
+        try:
+            conn = await self.get_connection(ip, port)
+            if conn is None:
+                return None
+            
+            return await asyncio.wait_for(
+                conn.request_bitfield(info_hash),
+                timeout=BITFIELD_TIMEOUT
+            )
+        except Exception as e:
+            logger.debug(f"No bitfield from {ip}:{port}: {e!r}")
+            await self.close_connection(ip, port)
+            return None
+
+
 class FileDownloader:
     """
     Downloads complete files using multiple peers.
@@ -219,16 +665,22 @@ class FileDownloader:
     Coordinates chunk downloads across multiple peers for speed.
     """
     
-    def __init__(self, storage: ChunkStorage, max_concurrent: int = 5):
+    def __init__(self, storage: ChunkStorage, max_concurrent: int = 8,
+                 min_concurrency: int = 2, max_concurrency: int = 64):
         """
         Initialize file downloader.
         
         Args:
             storage: Where to store downloaded chunks
-            max_concurrent: Maximum concurrent chunk downloads
+            max_concurrent: Concurrent chunk downloads at the start of each
+                file; tuned from there by measured throughput
+            min_concurrency: Lower bound for the tuned concurrency
+            max_concurrency: Upper bound for the tuned concurrency
         """
         self.storage = storage
         self.max_concurrent = max_concurrent
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
         self.chunk_downloader = ChunkDownloader(max_connections=max_concurrent * 2)
         
         # Statistics
@@ -274,47 +726,107 @@ class FileDownloader:
             downloaded_chunks=0,
         )
         
-        # Create download tasks
-        semaphore = asyncio.Semaphore(self.max_concurrent)
+        # Rarest first: chunks few peers have are fetched before common
+        # ones, so they're secured while those peers are still around
+        missing_chunks, holders = await self._schedule_rarest_first(
+            manifest, missing_chunks, peers
+        )
         
-        async def download_chunk_with_retry(chunk_hash: str) -> bool:
-            """Download a chunk with retry across peers."""
-            async with semaphore:
-                # Try each peer
-                for ip, port in peers:
+        # Workers per peer pull chunks from one shared queue (work
+        # stealing); the limiter still tunes how many transfer at once.
+        # Enough workers that the limiter can reach its maximum
+        queue = _ChunkQueue(missing_chunks, holders, peers)
+        limiter = ConcurrencyLimiter(
+            self.max_concurrent, self.min_concurrency, self.max_concurrency,
+            timeout_count=lambda: self.chunk_downloader.timeouts,
+        )
+        workers_per_peer = max(1, -(-self.max_concurrency // len(peers)))
+        last_report = 0.0
+        
+        # No more workers for a peer than chunks it can serve: a small
+        # download or a peer with few of the chunks starts no idle tasks
+        unclaimed = sum(1 for h in missing_chunks if h not in holders)
+        held: Dict[Tuple[str, int], int] = {}
+        for have in holders.values():
+            for peer in have:
+                held[peer] = held.get(peer, 0) + 1
+        
+        async def fetch(ip: str, port: int, chunk_hash: str) -> Optional[bool]:
+            nonlocal last_report
+            async with limiter:
+                try:
                     data = await self.chunk_downloader.download_chunk(
                         ip, port, chunk_hash
                     )
-                    
-                    if data:
-                        # Store the chunk
-                        success = await self.storage.store_chunk(chunk_hash, data)
-                        if success:
-                            progress.downloaded_chunks += 1
-                            progress.bytes_downloaded += len(data)
-                            
-                            if progress_callback:
-                                progress_callback(progress)
-                            
-                            return True
+                except ConnectionError:
+                    return None  # Lost with a connection; not a failure
+                if not data:
+                    return False
+                
+                # Store the chunk (download_chunk verified it). A storage
+                # error (disk full...) fails the chunk like a bad download
+                try:
+                    if not await self.storage.store_chunk(chunk_hash, data, verified=True):
+                        return False
+                except OSError as e:
+                    logger.error(f"Failed to store chunk {chunk_hash[:16]}: {e}")
+                    return False
+                
+                progress.downloaded_chunks += 1
+                progress.bytes_downloaded += len(data)
+                limiter.completed(len(data))
+                
+                # Callbacks usually redraw or push an event; hundreds a
+                # second would cost more than the chunks themselves
+                now = time.monotonic()
+                if progress_callback and (
+                        now - last_report >= PROGRESS_INTERVAL
+                        or progress.downloaded_chunks == progress.total_chunks):
+                    last_report = now
+                    progress_callback(progress)
                 
-                # All peers failed
-                progress.failed_chunks += 1
-                return False
-        
-        # Download all chunks
-        tasks = [
-            download_chunk_with_retry(chunk_hash)
-            for chunk_hash in missing_chunks
+                return True
+        
+        async def worker(peer: Tuple[str, int]):
+            failures = 0
+            while failures < PEER_MAX_FAILURES:
+                chunk_hash = await queue.take(peer)
+                if chunk_hash is None:
+                    return
+                ok = await fetch(*peer, chunk_hash)
+                if ok is None:
+                    await queue.retry(chunk_hash)
+                    continue
+                await queue.done(peer, chunk_hash, ok)
+                failures = 0 if ok else failures + 1
+            
+            # This peer keeps failing; leave its chunks to the others
+            logger.debug(f"Giving up on {peer[0]}:{peer[1]} for {manifest.name}")
+            await queue.retire(peer)
+        
+        # Download all chunks. Workers start eagerly, so each sends its
+        # first request (usually over an already pooled connection) now
+        workers = [
+            _start_task(worker(peer))
+            for peer in peers
+            for _ in range(min(workers_per_peer, held.get(peer, 0) + unclaimed))
         ]
-        
-        results = await asyncio.gather(*tasks)
-        
-        # Close connections
-        await self.chunk_downloader.close_all()
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            # If one worker raised (or we were cancelled), stop the rest;
+            # they would otherwise keep downloading, then wait on the
+            # queue forever. Closing the queue also ends any worker that
+            # missed its cancellation (wait_for can swallow one on 3.11)
+            for task in workers:
+                task.cancel()
+            await queue.close()
+        progress.failed_chunks = queue.failed
+        
+        logger.debug(f"Concurrency for {manifest.name} ended at {limiter.limit}")
         
         # Check results
-        success_count = sum(1 for r in results if r)
+        success_count = progress.downloaded_chunks
         
         if success_count < len(missing_chunks):
             logger.error(f"Download incomplete: {success_count}/{len(missing_chunks)} chunks")
@@ -331,6 +843,47 @@ class FileDownloader:
         
         return result_path
     
+    async def _schedule_rarest_first(
+            self, manifest: FileManifest, missing_chunks: List[str],
+            peers: List[Tuple[str, int]]
+    ) -> Tuple[List[str], Dict[str, List[Tuple[str, int]]]]:
+        """
+        Order missing chunks rarest first and find who holds each.
+        
+        Bitfields are fetched from all peers at once. A peer without one
+        (older node, error) might have any chunk, so it counts as holding
+        all of them. A chunk no peer claims keeps the full peer list:
+        someone may have fetched it since.
+        
+        Returns:
+            (missing chunks rarest first, chunk hash -> peers holding it)
+        """
+        bitfields = await asyncio.gather(*(
+            _start_task(self.chunk_downloader.download_bitfield(
+                ip, port, manifest.info_hash
+            ))
+            for ip, port in peers
+        ))
+        if all(bitfield is None for bitfield in bitfields):
+            return missing_chunks, {}
+        
+        holders: Dict[str, List[Tuple[str, int]]] = {}
+        wanted = set(missing_chunks)
+        for chunk_info in manifest.chunks:
+            if chunk_info.hash not in wanted:
+                continue
+            byte, mask = chunk_info.index >> 3, 0x80 >> (chunk_info.index & 7)
+            have = holders.setdefault(chunk_info.hash, [])
+            for peer, bitfield in zip(peers, bitfields):
+                if (bitfield is None
+                        or (byte < len(bitfield) and bitfield[byte] & mask)) \
+                        and peer not in have:
+                    have.append(peer)
+        
+        holders = {h: have for h, have in holders.items() if have}
+        ordered = sorted(missing_chunks, key=lambda h: len(holders.get(h, peers)))
+        return ordered, holders
+    
     async def download_from_dht(self, dht_node, info_hash: str,
                                progress_callback: ProgressCallback = None,
                                output_path: Path = None) -> Optional[Path]:
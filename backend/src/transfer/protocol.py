@@ -44,14 +44,26 @@ Header JSON:
 
 import asyncio
 import json
+import os
 import struct
 import logging
+from collections import deque
+from pathlib import Path
 from enum import Enum
-from typing import Optional, Tuple, Callable, Awaitable, Dict, Any
+from typing import Optional, Tuple, Callable, Awaitable, Dict, Any, Deque, Set
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
+# Message data read with a hasher is read (and hashed) in pieces this big;
+# large enough that handing a piece to a worker thread is cheap next to
+# hashing it
+STREAM_PIECE_SIZE = 256 * 1024
+
+# How long (seconds) the response to a timed-out request is still waited
+# for, to be discarded, before the connection is given up as stalled
+LATE_RESPONSE_GRACE = 30.0
+
 
 class TransferMessageType(Enum):
     """Transfer protocol message types."""
@@ -65,6 +77,10 @@ class TransferMessageType(Enum):
     MANIFEST_DATA = "MANIFEST_DATA"
     MANIFEST_NOT_FOUND = "MANIFEST_NOT_FOUND"
     
+    # Which chunks of a file a peer has (unknown file: MANIFEST_NOT_FOUND)
+    REQUEST_BITFIELD = "REQUEST_BITFIELD"
+    BITFIELD = "BITFIELD"
+    
     # Control
     ERROR = "ERROR"
     PING = "PING"
@@ -80,28 +96,48 @@ class TransferMessage:
     
     def to_bytes(self) -> bytes:
         """Serialize message to bytes."""
+        return self.frame_header(len(self.data)) + self.data
+    
+    def frame_header(self, data_length: int) -> bytes:
+        """
+        Serialize everything up to the data (length prefixes and header).
+        
+        Lets a sender write data_length bytes of data separately, e.g.
+        straight from a file with sendfile.
+        """
         # Create header JSON
         header_dict = {
             'type': self.type.value,
-            'data_length': len(self.data),
+            'data_length': data_length,
             **self.headers
         }
         header_bytes = json.dumps(header_dict).encode('utf-8')
         
         # Calculate total length (header + data)
-        total_length = len(header_bytes) + len(self.data)
+        total_length = len(header_bytes) + data_length
         
-        # Pack: length (4 bytes) + header_length (4 bytes) + header + data
+        # Pack: length (4 bytes) + header_length (4 bytes) + header
         return (
             struct.pack('>I', total_length) +
             struct.pack('>I', len(header_bytes)) +
-            header_bytes +
-            self.data
+            header_bytes
         )
     
     @classmethod
-    async def from_reader(cls, reader: asyncio.StreamReader) -> Optional['TransferMessage']:
-        """Read a message from a stream."""
+    async def from_reader(cls, reader: asyncio.StreamReader,
+                          hasher=None) -> Optional['TransferMessage']:
+        """
+        Read a message from a stream.
+        
+        Args:
+            reader: Stream to read from
+            hasher: Optional hashlib object updated with the data piece by
+                piece as it arrives, so hashing overlaps the network read
+                instead of making a second pass over the whole buffer.
+                The updates run in the default executor (hashlib releases
+                the GIL), one at a time and in order, so the event loop
+                never hashes and other transfers keep going meanwhile
+        """
         try:
             # Read total length
             length_bytes = await reader.readexactly(4)
@@ -121,7 +157,23 @@ class TransferMessage:
             
             # Read data
             data_length = total_length - header_length
-            data = await reader.readexactly(data_length) if data_length > 0 else b''
+            if hasher is None:
+                data = await reader.readexactly(data_length) if data_length > 0 else b''
+            else:
+                loop = asyncio.get_running_loop()
+                data = bytearray(data_length)
+                view = memoryview(data)
+                hashing = None  # Update of the previous piece
+                for start in range(0, data_length, STREAM_PIECE_SIZE):
+                    piece = await reader.readexactly(
+                        min(STREAM_PIECE_SIZE, data_length - start)
+                    )
+                    view[start:start + len(piece)] = piece
+                    if hashing is not None:
+                        await hashing
+                    hashing = loop.run_in_executor(None, hasher.update, piece)
+                if hashing is not None:
+                    await hashing
             
             # Extract type and remaining headers
             msg_type = TransferMessageType(header_dict.pop('type'))
@@ -142,8 +194,21 @@ class TransferProtocol:
     
     Handles sending/receiving messages over TCP.
     
-    Thread-safe: Uses a lock to ensure only one request/response
-    pair is active at a time per connection.
+    Requests are pipelined: any number of request_* calls may be in
+    flight on one connection, each written as soon as it is made, so
+    a peer's round trip is paid once per batch rather than per chunk.
+    Servers answer requests in the order they arrive, so responses are
+    matched to requests first in, first out by a single reader task (no
+    request IDs on the wire, which keeps older peers compatible). A
+    request whose caller gave up still gets its response read, and
+    discarded, keeping the rest in step. The server serves requests one
+    after another, so a request's timeout runs from its turn (the
+    previous response read), not from when it was sent: one slow
+    response must not run out the clocks of everything queued behind
+    it. A connection whose late response doesn't come within
+    LATE_RESPONSE_GRACE is closed as stalled.
+    
+    Server-side sends use a lock so messages are never interleaved.
     """
     
     def __init__(self, reader: asyncio.StreamReader, 
@@ -151,14 +216,27 @@ class TransferProtocol:
         self.reader = reader
         self.writer = writer
         self._closed = False
-        # Lock to prevent concurrent reads/writes on the same connection
+        # Lock to prevent interleaved writes of server-side messages
         self._lock = asyncio.Lock()
+        
+        # Requests awaiting responses, oldest first: (future, hasher,
+        # turn), turn being set once the previous response is read
+        self._pending: Deque[Tuple[asyncio.Future, Any, asyncio.Event]] = deque()
+        self._has_pending = asyncio.Event()
+        self._reader_task: Optional[asyncio.Task] = None
+        # Tasks waiting out LATE_RESPONSE_GRACE for timed-out requests
+        self._late_watches: Set[asyncio.Task] = set()
     
     @property
     def remote_address(self) -> Tuple[str, int]:
         """Get remote peer address."""
         return self.writer.get_extra_info('peername')
     
+    @property
+    def in_flight(self) -> int:
+        """Requests sent and not yet answered."""
+        return len(self._pending)
+    
     async def send(self, message: TransferMessage):
         """Send a message."""
         if self._closed:
@@ -178,62 +256,198 @@ class TransferProtocol:
         """Close the connection."""
         if not self._closed:
             self._closed = True
+            if self._reader_task is not None:
+                self._reader_task.cancel()
+            for task in self._late_watches:
+                if task is not asyncio.current_task():
+                    task.cancel()
+            self._fail_pending()
             self.writer.close()
             await self.writer.wait_closed()
     
+    def _fail_pending(self):
+        """Fail every request still waiting for a response."""
+        while self._pending:
+            future, _, turn = self._pending.popleft()
+            turn.set()
+            if not future.done():
+                future.set_exception(ConnectionError("Connection closed"))
+    
+    async def _request(self, request: TransferMessage, hasher=None,
+                       timeout: Optional[float] = None) -> Optional[TransferMessage]:
+        """
+        Send a request and wait for its response.
+        
+        Args:
+            request: The request to send
+            hasher: Passed to TransferMessage.from_reader for the response
+            timeout: Seconds allowed from this request's turn, i.e. once
+                the response to the previous request is read
+        
+        Returns:
+            The response, or None if the connection broke first
+        
+        Raises:
+            asyncio.TimeoutError: No response in time. The connection stays
+                usable; the late response is read and discarded
+        """
+        if self._closed:
+            raise ConnectionError("Connection closed")
+        
+        future = asyncio.get_running_loop().create_future()
+        turn = asyncio.Event()
+        if not self._pending:
+            turn.set()
+        # Writing and queueing without an await in between keeps the
+        # queue in the order the requests go out
+        self.writer.write(request.to_bytes())
+        self._pending.append((future, hasher, turn))
+        self._has_pending.set()
+        if self._reader_task is None:
+            self._reader_task = asyncio.create_task(self._read_responses())
+        
+        try:
+            await self.writer.drain()
+            await turn.wait()
+            # wait_for cancels the future on timeout, so the reader
+            # discards its response
+            return await asyncio.wait_for(future, timeout)
+        except ConnectionError:
+            return None
+        except asyncio.TimeoutError:
+            task = asyncio.create_task(self._await_late_response(future))
+            self._late_watches.add(task)
+            task.add_done_callback(self._late_watches.discard)
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            elif not future.cancelled():
+                future.exception()  # Mark it retrieved; nobody else will
+    
+    async def _read_responses(self):
+        """Reader task: hand each response to the oldest pending request."""
+        try:
+            while not self._closed:
+                if not self._pending:
+                    self._has_pending.clear()
+                    await self._has_pending.wait()
+                    continue
+                
+                future, hasher, _ = self._pending[0]
+                # A request whose caller gave up needs no hashing
+                response = await TransferMessage.from_reader(
+                    self.reader, None if future.done() else hasher
+                )
+                if response is None:
+                    break  # Connection broken or out of step
+                
+                self._pending.popleft()
+                if self._pending:
+                    self._pending[0][2].set()
+                if not future.done():
+                    future.set_result(response)
+        finally:
+            self._fail_pending()
+            if not self._closed:
+                self._closed = True
+                self.writer.close()
+    
+    async def _await_late_response(self, future: asyncio.Future):
+        """Close the connection if a timed-out request stays unanswered."""
+        await asyncio.sleep(LATE_RESPONSE_GRACE)
+        if any(f is future for f, _, _ in self._pending):
+            logger.warning(f"No response from {self.remote_address} in "
+                           f"{LATE_RESPONSE_GRACE:.0f}s; closing connection")
+            await self.close()
+    
     # === High-level operations ===
     
-    async def request_chunk(self, chunk_hash: str) -> Optional[bytes]:
+    async def ping(self) -> bool:
+        """Check the connection with a PING; True if the peer answered."""
+        response = await self._request(
+            TransferMessage(type=TransferMessageType.PING, headers={})
+        )
+        return response is not None and response.type == TransferMessageType.PONG
+    
+    async def request_chunk(self, chunk_hash: str, hasher=None,
+                            timeout: Optional[float] = None) -> Optional[bytes]:
         """
         Request a chunk from the peer.
         
+        Args:
+            chunk_hash: Hash of the chunk (hex)
+            hasher: Optional hashlib object fed the data as it arrives
+                (see TransferMessage.from_reader)
+            timeout: Seconds allowed once the peer gets to this request
+                (see _request)
+        
         Returns:
             Chunk data, or None if not found/error
+        
+        Raises:
+            asyncio.TimeoutError: The peer took longer than timeout
         """
-        # Use lock to ensure request/response pair is atomic
-        async with self._lock:
-            request = TransferMessage(
-                type=TransferMessageType.REQUEST_CHUNK,
-                headers={'chunk_hash': chunk_hash}
-            )
-            data = request.to_bytes()
-            self.writer.write(data)
-            await self.writer.drain()
-            
-            response = await TransferMessage.from_reader(self.reader)
-            if response is None:
-                return None
-            
-            if response.type == TransferMessageType.CHUNK_DATA:
-                return response.data
-            
-            return None
+        request = TransferMessage(
+            type=TransferMessageType.REQUEST_CHUNK,
+            headers={'chunk_hash': chunk_hash}
+        )
+        response = await self._request(request, hasher, timeout)
+        
+        if response is not None and response.type == TransferMessageType.CHUNK_DATA:
+            return response.data
+        
+        return None
     
-    async def request_manifest(self, info_hash: str) -> Optional[str]:
+    async def request_manifest(self, info_hash: str) -> Optional[bytes]:
         """
         Request a file manifest from the peer.
         
         Returns:
-            Manifest JSON string, or None if not found
+            Manifest JSON (UTF-8 bytes), or None if not found
+        """
+        request = TransferMessage(
+            type=TransferMessageType.REQUEST_MANIFEST,
+            headers={'info_hash': info_hash}
+        )
+        response = await self._request(request)
+        
+        if response is not None and response.type == TransferMessageType.MANIFEST_DATA:
+            return response.data
+        
+        return None
+    
+    async def request_bitfield(self, info_hash: str) -> Optional[bytes]:
+        """
+        Ask the peer which chunks of a file it has.
+        
+        Returns:
+            Bitfield (bit i, most significant bit first, set if the peer
+            has chunk i of the manifest), or None if the peer doesn't
+            know the file
         """
-        # Use lock to ensure request/response pair is atomic
+        request = TransferMessage(
+            type=TransferMessageType.REQUEST_BITFIELD,
+            headers={'info_hash': info_hash}
+        )
+        response = await self._request(request)
+        
+        if response is not None and response.type == TransferMessageType.BITFIELD:
+            return response.data
+        
+        return None
+    
+    async def send_bitfield(self, info_hash: str, bitfield: bytes):
+        """Send a file's chunk bitfield to the peer."""
         async with self._lock:
-            request = TransferMessage(
-                type=TransferMessageType.REQUEST_MANIFEST,
-                headers={'info_hash': info_hash}
+            message = TransferMessage(
+                type=TransferMessageType.BITFIELD,
+                headers={'info_hash': info_hash},
+                data=bitfield
             )
-            data = request.to_bytes()
+            data = message.to_bytes()
             self.writer.write(data)
             await self.writer.drain()
-            
-            response = await TransferMessage.from_reader(self.reader)
-            if response is None:
-                return None
-            
-            if response.type == TransferMessageType.MANIFEST_DATA:
-                return response.data.decode('utf-8')
-            
-            return None
     
     async def send_chunk(self, chunk_hash: str, data: bytes):
         """Send a chunk to the peer."""
@@ -247,6 +461,39 @@ class TransferProtocol:
             self.writer.write(data_bytes)
             await self.writer.drain()
     
+    async def send_chunk_file(self, chunk_hash: str, path: Path) -> int:
+        """
+        Send a chunk straight from its file.
+        
+        The data goes through loop.sendfile, which uses the zero-copy
+        sendfile(2) syscall where available (plain TCP on Unix; Windows'
+        proactor uses TransmitFile), so chunk bytes never pass through
+        Python. Elsewhere asyncio falls back to read/write itself, and on
+        loops without sendfile support (uvloop) we read and write.
+        
+        Raises:
+            OSError: If the file can't be opened (nothing was sent)
+        
+        Returns:
+            Number of data bytes sent
+        """
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            async with self._lock:
+                message = TransferMessage(
+                    type=TransferMessageType.CHUNK_DATA,
+                    headers={'chunk_hash': chunk_hash},
+                )
+                self.writer.write(message.frame_header(size))
+                try:
+                    await asyncio.get_running_loop().sendfile(
+                        self.writer.transport, f, 0, size
+                    )
+                except NotImplementedError:
+                    self.writer.write(f.read())
+                await self.writer.drain()
+        return size
+    
     async def send_chunk_not_found(self, chunk_hash: str):
         """Send chunk not found response."""
         async with self._lock:
@@ -258,13 +505,13 @@ class TransferProtocol:
             self.writer.write(data)
             await self.writer.drain()
     
-    async def send_manifest(self, info_hash: str, manifest_json: str):
-        """Send a manifest to the peer."""
+    async def send_manifest(self, info_hash: str, manifest_json: bytes):
+        """Send a manifest (UTF-8 encoded JSON) to the peer."""
         async with self._lock:
             message = TransferMessage(
                 type=TransferMessageType.MANIFEST_DATA,
                 headers={'info_hash': info_hash},
-                data=manifest_json.encode('utf-8')
+                data=manifest_json
             )
             data = message.to_bytes()
             self.writer.write(data)
@@ -49,6 +49,10 @@ class ChunkUploader:
             TransferMessageType.REQUEST_MANIFEST,
             self._handle_manifest_request
         )
+        self.server.set_handler(
+            TransferMessageType.REQUEST_BITFIELD,
+            self._handle_bitfield_request
+        )
         self.server.set_handler(
             TransferMessageType.PING,
             self._handle_ping
@@ -73,14 +77,19 @@ class ChunkUploader:
             await protocol.send_chunk_not_found('')
             return
         
-        # Get chunk from storage
-        chunk_data = await self.storage.get_chunk(chunk_hash)
+        # Send the chunk file directly (zero-copy where supported)
+        size = None
+        chunk_path = self.storage.chunk_file(chunk_hash)
+        if chunk_path is not None:
+            try:
+                size = await protocol.send_chunk_file(chunk_hash, chunk_path)
+            except FileNotFoundError:
+                pass  # Deleted since the lookup
         
-        if chunk_data:
-            await protocol.send_chunk(chunk_hash, chunk_data)
+        if size is not None:
             self.chunks_served += 1
-            self.bytes_uploaded += len(chunk_data)
-            logger.debug(f"Served chunk {chunk_hash[:16]}... ({len(chunk_data)} bytes)")
+            self.bytes_uploaded += size
+            logger.debug(f"Served chunk {chunk_hash[:16]}... ({size} bytes)")
         else:
             await protocol.send_chunk_not_found(chunk_hash)
             logger.debug(f"Chunk not found: {chunk_hash[:16]}...")
@@ -93,16 +102,29 @@ class ChunkUploader:
             await protocol.send_manifest_not_found('')
             return
         
-        # Get manifest from storage
-        manifest = await self.storage.get_manifest(info_hash)
+        # Send the stored JSON as is (no parse and re-serialize)
+        manifest_json = await self.storage.get_manifest_bytes(info_hash)
         
-        if manifest:
-            await protocol.send_manifest(info_hash, manifest.to_json())
+        if manifest_json:
+            await protocol.send_manifest(info_hash, manifest_json)
             logger.debug(f"Served manifest {info_hash[:16]}...")
         else:
             await protocol.send_manifest_not_found(info_hash)
             logger.debug(f"Manifest not found: {info_hash[:16]}...")
     
+    async def _handle_bitfield_request(self, message: TransferMessage,
+                                       protocol: TransferProtocol):
+        """Handle a request for which chunks of a file we have."""
+        info_hash = message.headers.get('info_hash')
+        manifest = await self.storage.get_manifest(info_hash) if info_hash else None
+        
+        if manifest:
+            # One stat per chunk; keep it off the event loop
+            bitfield = await asyncio.to_thread(self.storage.chunk_bitfield, manifest)
+            await protocol.send_bitfield(info_hash, bitfield)
+        else:
+            await protocol.send_manifest_not_found(info_hash or '')
+    
     async def _handle_ping(self, message: TransferMessage,
                           protocol: TransferProtocol):
         """Handle a ping (health check)."""